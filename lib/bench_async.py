@@ -0,0 +1,30 @@
+# Benchmark : sync match over a store with per-call latency vs. amatch with concurrent lookups
+import time
+import asyncio
+from regex_nfa import *
+from seqs_store import TrieStore, AsyncStore
+from bench_utils import timeit, load_words, report
+
+patterns = ['wh..', 'wh.r..', 'w(h|o).']
+
+def run(latency=0.002, concurrency=(1, 8, 64)):
+	n = Regex()
+	store = TrieStore(load_words())
+	def slow(prefix, head=None, end='.') :
+		time.sleep(latency)
+		return store(prefix, head=head, end=end)
+
+	rows = []
+	for regex in patterns :
+		expected = n.match(regex, store)
+		row = [regex, timeit(lambda: n.match(regex, slow), repeat=1)]
+		for c in concurrency :
+			astore = AsyncStore(store, latency=latency)
+			assert asyncio.run(n.amatch(regex, astore, concurrency=c)) == expected
+			row.append(timeit(lambda: asyncio.run(n.amatch(regex, astore, concurrency=c)), repeat=1))
+		rows.append(row)
+	report(f'wall time with {latency * 1000:.0f}ms store latency (sec)', rows, ['regex', 'sync'] + [ f'async c={c}' for c in concurrency ])
+
+
+if __name__ == '__main__' :
+	run()
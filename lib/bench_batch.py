@@ -0,0 +1,32 @@
+# Benchmark : per-prefix store calls vs. one batched call per step
+#  counts store round-trips and wall time for the README dict-words examples
+from regex_nfa import *
+from seqs_store import db_search, db_search_many
+from bench_utils import timeit, load_words, report
+
+class Counter(object):
+	def __init__(self, fun):
+		self.fun, self.calls = fun, 0
+	def __call__(self, *args, **kwargs):
+		self.calls += 1
+		return self.fun(*args, **kwargs)
+
+patterns = ['wh..', 'wh.+', 'wh.r..', 'w(h|o).']
+
+def run(patterns, repeat=1):
+	ww = load_words()
+	n = Regex()
+	rows = []
+	for regex in patterns :
+		one = Counter(partial(db_search, seqs=ww))
+		many = Counter(partial(db_search_many, seqs=ww))
+		assert sorted(n.match(regex, one)) == sorted(n.match(regex, match_prefixes_fun=many))
+		calls = (one.calls, many.calls)
+		t_one = timeit(lambda: n.match(regex, one), repeat)
+		t_many = timeit(lambda: n.match(regex, match_prefixes_fun=many), repeat)
+		rows.append((regex, *calls, t_one, t_many))
+	report(f'round-trips and wall time (sec) over {len(ww)} words', rows, ['regex', 'calls', 'batch calls', 'per-prefix', 'batched'])
+
+
+if __name__ == '__main__' :
+	run(patterns)
@@ -0,0 +1,31 @@
+# Benchmark : CachedStore over a slow store, patterns sharing prefixes matched one after another
+#  python bench_cache.py [latency per lookup in sec]
+import sys
+import time
+from regex_nfa import *
+from seqs_store import TrieStore, CachedStore
+from bench_utils import timeit, load_words, report
+
+patterns = ['wh..', 'wh.+', 'wh.r..', 'w(h|o).', 'whe.+', 'th.+', 'the.', 'th(e|i)..']
+
+#remote-like store : every lookup sleeps latency
+def slow(store, latency):
+	def search(prefix, head=None, end='.'):
+		time.sleep(latency)
+		return store(prefix, head=head, end=end)
+	return search
+
+def run(latency=0.0005):
+	rx = Regex()
+	store = slow(TrieStore(load_words()), latency)
+	rows = []
+	for name, maxsize, maxbytes in (('off', None, None), ('1000 entries', 1000, None), ('64KB', None, 2**16), ('unbounded', None, None)) :
+		fun = store if name == 'off' else CachedStore(store, maxsize=maxsize, maxbytes=maxbytes)
+		t = timeit(lambda: [ rx.match(r, fun, max_steps=12) for r in patterns ], 1)
+		st = fun.stats() if name != 'off' else { 'hit_rate': 0.0, 'calls': '-', 'bytes': 0 }
+		rows.append((name, t, f"{st['hit_rate']:.2f}", st['calls'], st['bytes']))
+	report(f'{len(patterns)} patterns, {latency * 1000:.1f} ms per store lookup (sec)', rows, ['cache', 'time', 'hit rate', 'store calls', 'bytes'])
+
+
+if __name__ == '__main__' :
+	run(float(sys.argv[1]) if len(sys.argv) > 1 else 0.0005)
@@ -0,0 +1,44 @@
+# Benchmark : recursive per-step epsilon closures vs. closures precomputed per compiled NFA
+import random
+from regex_nfa import *
+from bench_utils import timeit, report
+
+#match_one as it was : a fresh recursive closure walk for every state on every step
+def closure(state, next_states, visited):
+	if state.hasE :
+		for st in state.E :
+			if st not in visited :
+				visited.add(st)
+				closure(st, next_states, visited)
+	else : next_states.append(state)
+
+def match_one_recursive(nfa, seq):
+	current = []
+	closure(nfa.start, current, set())
+	for symbol in seq :
+		nxt = []
+		for state in current :
+			if not state.hasT or (symbol not in state.T and state.sym != ANY) : continue
+			closure(state.T[state.sym], nxt, set())
+		current = nxt
+	return any(s.hasIsE for s in current)
+
+patterns = [ '(a|b)*c{2,8}', '((a|b)*c)*d?c{2,8}', '(a|b|c)*(ab|ba)+c{2,8}' ]
+
+def run(lengths=(100, 1000, 10000), repeat=3):
+	rx = Regex()
+	rows = []
+	rnd = random.Random(42)
+	for regex in patterns :
+		pattern = rx.compile(regex)
+		for n in lengths :
+			seq = ''.join(rnd.choice('ab') for _ in range(n)) + 'cccc'
+			assert match_one_recursive(pattern.nfa, seq) == rx.match_one(pattern, seq)
+			t_rec = timeit(lambda: match_one_recursive(pattern.nfa, seq), repeat)
+			t_pre = timeit(lambda: rx.match_one(pattern, seq), repeat)
+			rows.append((regex[:12], n, t_rec, t_pre, f'{t_rec / t_pre:.1f}x'))
+	report('match_one over long inputs (sec)', rows, ['regex', 'length', 'recursive', 'precomputed', 'speedup'])
+
+
+if __name__ == '__main__' :
+	run()
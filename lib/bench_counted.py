@@ -0,0 +1,32 @@
+# Benchmark : counted repetition {n,m} (one copy of the body + a counter) vs the same pattern unrolled
+#  into m copies of the body, NFA size, compile and match time as m grows
+from regex_nfa import *
+from seqs_store import TrieStore
+from bench_utils import timeit, report
+
+ms = [2, 10, 100, 500]
+
+def unrolled(body, n, m) : return body * n + [ t for _ in range(m - n) for t in ['('] + body + [')', '?'] ]
+
+def run(repeat=3):
+	rx = Regex()
+	rows = []
+	for m in ms :
+		n = max(1, m // 2)
+		cases = [ ('str', 'x(ab|c){%d,%d}y' % (n, m), 'x' + ''.join(unrolled(['(', 'ab|c', ')'], n, m)) + 'y', 'x' + 'abc' * (m // 2) + 'y'),
+			('int', [1, '{%d,%d}' % (n, m), 5], [1] + unrolled([1], n - 1, m - 1) + [5], [1] * m + [5]) ]
+		for kind, counted, plain, seq in cases :
+			store = TrieStore([seq, seq[:-1], seq[:len(seq)//2]])
+			for name, regex in (('counter', counted), ('unrolled', plain)) :
+				Regex.cache.clear()
+				compile_time = timeit(lambda: rx.to_nfa(regex), repeat)
+				pattern = rx.compile(regex)
+				assert rx.match_one(pattern, seq)
+				rows.append((kind, m, name, len(pattern.states), compile_time,
+					timeit(lambda: rx.match_one(pattern, seq), repeat),
+					timeit(lambda: rx.match(pattern, store, max_steps=2 * m + 4), repeat)))
+	report('counted repetition, {m/2,m} (sec)', rows, ['seqs', 'm', 'nfa', 'states', 'compile', 'match_one', 'match'])
+
+
+if __name__ == '__main__' :
+	run()
@@ -0,0 +1,29 @@
+# Benchmark : bulk match_one validation, NFA simulation vs. lazy DFA
+import random
+from regex_nfa import *
+from bench_utils import timeit, report
+
+patterns = [
+	('str', '[abc]+(x|y)?z', lambda rnd: ''.join(rnd.choice('abcxyz') for _ in range(rnd.randint(2, 12)))),
+	('str', '(a|b)*c{2,8}', lambda rnd: ''.join(rnd.choice('abc') for _ in range(rnd.randint(2, 12)))),
+	('str', 'w(h|o).+', lambda rnd: 'w' + ''.join(rnd.choice('hoaer') for _ in range(rnd.randint(1, 8)))),
+	('int', [1,'.','+',3], lambda rnd: [ rnd.randrange(5) for _ in range(rnd.randint(2, 12)) ]),
+	('word', ['hi','+','(','world','|','buddy',')'], lambda rnd: [ rnd.choice(['hi','world','buddy','ho']) for _ in range(rnd.randint(1, 6)) ]),
+]
+
+def run(n=100000, repeat=3):
+	rx = Regex()
+	rows = []
+	for kind, regex, gen in patterns :
+		rnd = random.Random(42)
+		data = [ gen(rnd) for _ in range(n) ]
+		nfa = [ rx.match_one(regex, s) for s in data ]
+		assert nfa == [ rx.match_one(regex, s, dfa=True) for s in data ]
+		t_nfa = timeit(lambda: [ rx.match_one(regex, s) for s in data ], repeat)
+		t_dfa = timeit(lambda: [ rx.match_one(regex, s, dfa=True) for s in data ], repeat)
+		rows.append((kind, str(regex)[:14], sum(nfa), t_nfa, t_dfa, f'{t_nfa / t_dfa:.1f}x', len(rx.compile(regex).dfa().sets)))
+	report(f'match_one over {n} sequences (sec)', rows, ['kind', 'regex', 'matched', 'nfa', 'dfa', 'speedup', 'dfa states'])
+
+
+if __name__ == '__main__' :
+	run()
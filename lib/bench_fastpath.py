@@ -0,0 +1,27 @@
+# Benchmark : literal/mask/class fast path (fastpath.py) vs the generic NFA path
+#  match_one over every word and match_many over a Corpus
+from regex_nfa import *
+from vector_match import Corpus
+from bench_utils import timeit, load_words, report
+
+patterns = ['why', 'where', 'wh..', 'wh.r..', '..r.s', 'w[hi]..', '[bc]a[rt]', '.....']
+
+def run(repeat=3):
+	rx = Regex()
+	words = load_words()
+	corpus = Corpus(words)
+	rows = []
+	for regex in patterns :
+		kind = rx.compile(regex).fixed.kind
+		assert (rx.match_many(regex, corpus) == rx.match_many(regex, corpus, fast=False)).all()
+		rows.append((regex, kind, int(rx.match_many(regex, corpus).sum()),
+			timeit(lambda: [ rx.match_one(regex, w, fast=False) for w in words ], repeat),
+			timeit(lambda: [ rx.match_one(regex, w) for w in words ], repeat),
+			timeit(lambda: rx.match_many(regex, corpus, fast=False), repeat),
+			timeit(lambda: rx.match_many(regex, corpus), repeat)))
+	report(f'{len(words)} words, generic vs fast path (sec)', rows,
+		['regex', 'kind', 'matched', 'one/nfa', 'one/fast', 'many/dfa', 'many/fast'])
+
+
+if __name__ == '__main__' :
+	run()
@@ -0,0 +1,35 @@
+# Benchmark : literal-prefix head and required-literal pushdown, store calls and rows scanned
+from regex_nfa import *
+from seqs_store import db_search
+from bench_utils import timeit, load_words, report
+
+patterns = ['why', 'wh..', 'wh.+', 'wh.r..', 'w(h|o).', 'whe.+', 'inter.+', '.+ing']
+
+def counting(words):
+	stats = { 'calls': 0, 'rows': 0 }
+	def search(prefix, head=None, end='.', required=None):
+		res = db_search(prefix, seqs=words, head=head, end=end, required=required)
+		stats['calls'] += 1
+		stats['rows'] += len(res)
+		return res
+	return search, stats
+
+def run(repeat=3):
+	rx = Regex()
+	words = load_words()
+	rows = []
+	for regex in patterns :
+		row = [regex]
+		for auto in (False, True) :
+			search, stats = counting(words)
+			res = rx.match(regex, search, max_steps=12, auto_head=auto)
+			t = timeit(lambda: rx.match(regex, search, max_steps=12, auto_head=auto), repeat)
+			row += [ stats['calls'], stats['rows'], t ]
+		assert len(row) == 7
+		rows.append(tuple(row) + (len(res),))
+	report(f'match over {len(words)} words, auto_head off vs on (sec)', rows,
+		['regex', 'calls', 'rows', 'time', 'calls/auto', 'rows/auto', 'time/auto', 'matched'])
+
+
+if __name__ == '__main__' :
+	run()
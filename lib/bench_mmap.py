@@ -0,0 +1,56 @@
+# Benchmark : memory-mapped corpus vs in-memory stores, startup, resident python memory and match time
+#  python bench_mmap.py [number of sequences]
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+from regex_nfa import *
+from seqs_store import TrieStore
+from mmap_store import MmapCorpus
+from bench_utils import timeit, gen_words, gen_int_seqs, report
+
+patterns = {
+	'word': ['abc.+', 'x(y|z)..', 'q.e.', '(a|b)(c|d)e.+'],
+	'int' : [[1,2,'.','+'], [7,'.',7,'.'], [42,'(',1,'|',2,')','.','+']],
+}
+
+#(result, seconds, python memory allocated by fun in MB)
+def measure(fun):
+	tracemalloc.start()
+	t0 = time.perf_counter()
+	res = fun()
+	t = time.perf_counter() - t0
+	mem = tracemalloc.get_traced_memory()[0] / 2**20
+	tracemalloc.stop()
+	return res, t, mem
+
+def run(n=1000000, repeat=3):
+	rx = Regex()
+	with tempfile.TemporaryDirectory() as d :
+		for kind, gen in (('word', lambda: gen_words(n, max_len=12)), ('int', lambda: gen_int_seqs(n, vocab=100))) :
+			seqs, t_seqs, m_seqs = measure(gen)
+			t0 = time.perf_counter()
+			MmapCorpus.build(seqs, f'{d}/{kind}')
+			t_build = time.perf_counter() - t0
+			trie, t_trie, m_trie = measure(lambda: TrieStore(seqs))
+			mm, t_mm, m_mm = measure(lambda: MmapCorpus(f'{d}/{kind}'))
+			size = sum(os.path.getsize(f'{d}/{kind}/{f}') for f in os.listdir(f'{d}/{kind}')) / 2**20
+			report(f'{len(seqs)} {kind} sequences : startup (sec) and python memory (MB), build {t_build:.1f} sec', [
+				('list', t_seqs, m_seqs, '-'), ('trie', t_trie, m_trie, '-'), ('mmap', t_mm, m_mm, f'{size:.1f}')],
+				['store', 'startup', 'memory', 'file MB'])
+
+			rows = []
+			for regex in patterns[kind] :
+				res = rx.match(regex, trie, max_steps=12)
+				assert sorted(map(str, res)) == sorted(map(str, rx.match(regex, mm, max_steps=12)))
+				cold = MmapCorpus(f'{d}/{kind}')
+				rows.append((str(regex)[:14], len(res),
+					timeit(lambda: rx.match(regex, trie, max_steps=12), repeat),
+					timeit(lambda: rx.match(regex, cold, max_steps=12), 1),
+					timeit(lambda: rx.match(regex, mm, max_steps=12), repeat)))
+			report(f'match over {len(seqs)} {kind} sequences (sec)', rows, ['regex', 'matched', 'trie', 'mmap', 'mmap/cached'])
+
+
+if __name__ == '__main__' :
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
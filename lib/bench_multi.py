@@ -0,0 +1,38 @@
+# Benchmark : many standing patterns, one match() per pattern vs match_multi() in one pass
+import random
+from regex_nfa import *
+from seqs_store import TrieStore
+from bench_utils import timeit, load_words, report
+
+#patterns sharing early prefixes, like rule sets do
+def gen_patterns(n, seed=42):
+	rnd = random.Random(seed)
+	heads = [ 'a', 'b', 'c', 'ab', 'ca', 'ma', 'st', 'th' ]
+	tails = [ '.', '..', '.+', '(a|e).', '.?s', 'e.+', '(r|n)..' ]
+	return sorted({ rnd.choice(heads) + rnd.choice(tails) for _ in range(n * 3) })[:n]
+
+def counting(store):
+	stats = { 'calls': 0 }
+	def search(prefix, head=None, end='.', allowed=None):
+		stats['calls'] += 1
+		return store(prefix, head=head, end=end, allowed=allowed)
+	return search, stats
+
+def run(repeat=3):
+	rx = Regex()
+	store = TrieStore(load_words())
+	rows = []
+	for n in (5, 10, 25, 50) :
+		patterns = gen_patterns(n)
+		single, s1 = counting(store)
+		multi, s2 = counting(store)
+		res = [ rx.match(p, single, max_steps=12) or [] for p in patterns ]
+		assert [ sorted(r) for r in res ] == [ sorted(r) for r in rx.match_multi(patterns, multi, max_steps=12) ]
+		rows.append((len(patterns), s1['calls'], s2['calls'],
+			timeit(lambda: [ rx.match(p, store, max_steps=12) for p in patterns ], repeat),
+			timeit(lambda: rx.match_multi(patterns, store, max_steps=12), repeat)))
+	report('patterns matched one by one vs match_multi (sec)', rows, ['patterns', 'calls', 'calls/multi', 'time', 'time/multi'])
+
+
+if __name__ == '__main__' :
+	run()
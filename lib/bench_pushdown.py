@@ -0,0 +1,42 @@
+# Benchmark : symbol filters pushed down to the store, rows (objects) and bytes returned per match
+import pickle
+from regex_nfa import *
+from seqs_store import db_search, TrieStore
+from bench_utils import timeit, load_words, report
+
+patterns = ['wh.r..', 'w(h|o).+', 'a(b|c|d)e.', '(a|b|c)(d|e)..', 'th(e|i)(n|s).', 'wh.+']
+
+#store wrapper counting the rows and pickled bytes it returns
+def counting(search, pushdown):
+	stats = { 'rows': 0, 'bytes': 0 }
+	def transfer(res):
+		stats['rows'] += len(res)
+		stats['bytes'] += len(pickle.dumps(res))
+		return res
+	if pushdown :
+		def fun(prefix, head=None, end='.', allowed=None): return transfer(search(prefix, head=head, end=end, allowed=allowed))
+	else :
+		def fun(prefix, head=None, end='.'): return transfer(search(prefix, head=head, end=end))
+	return fun, stats
+
+def run(repeat=3):
+	rx = Regex()
+	words = load_words()
+	trie = TrieStore(words)
+	scan = lambda prefix, head=None, end='.', allowed=None : db_search(prefix, words, head=head, end=end, allowed=allowed)
+	for name, search, rep in (('trie', trie.search, repeat), ('scan', scan, 1)) :
+		rows = []
+		for regex in patterns :
+			row = [regex]
+			for pushdown in (False, True) :
+				fun, stats = counting(search, pushdown)
+				res = rx.match(regex, fun, max_steps=12)
+				t = timeit(lambda: rx.match(regex, fun, max_steps=12), rep)
+				row += [ stats['rows'] // (rep + 1), stats['bytes'] // (rep + 1), t ]
+			rows.append(tuple(row) + (len(res),))
+		report(f'{name} store over {len(words)} words, rows/bytes returned without vs with pushdown (sec)', rows,
+			['regex', 'rows', 'bytes', 'time', 'rows/push', 'bytes/push', 'time/push', 'matched'])
+
+
+if __name__ == '__main__' :
+	run()
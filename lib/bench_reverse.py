@@ -0,0 +1,36 @@
+# Benchmark : left-to-right vs right-to-left (SuffixStore) matching, patterns with wide heads and literal tails
+from regex_nfa import *
+from seqs_store import TrieStore, SuffixStore
+from bench_utils import timeit, load_words, report
+
+patterns = ['.+ing', '..r.s', '.+(ed|er)', '...ly', 'wh.r..', 'w(h|o).', 'a.+z']
+
+def counting(store):
+	stats = { 'calls': 0 }
+	def search(prefix, head=None, end='.', allowed=None):
+		stats['calls'] += 1
+		return store(prefix, head=head, end=end, allowed=allowed)
+	return search, stats
+
+def run(repeat=3):
+	rx = Regex()
+	words = load_words()
+	fwd, bwd = TrieStore(words), SuffixStore(words)
+	rows = []
+	for regex in patterns :
+		f, fs = counting(fwd)
+		res = rx.match(regex, f, max_steps=12, direction='forward')
+		f, auto_fs = counting(fwd)
+		b, auto_bs = counting(bwd)
+		auto = rx.match(regex, f, match_suffix_fun=b, max_steps=12)
+		assert sorted(res or []) == sorted(auto or [])
+		direction = 'backward' if rx.backward(rx.compile(regex), rx.compile_reversed(regex)) else 'forward'
+		rows.append((regex, len(res or []), direction, fs['calls'], auto_fs['calls'] + auto_bs['calls'],
+			timeit(lambda: rx.match(regex, fwd, max_steps=12, direction='forward'), repeat),
+			timeit(lambda: rx.match(regex, fwd, match_suffix_fun=bwd, max_steps=12), repeat)))
+	report(f'match over {len(words)} words, forward vs auto direction (sec)', rows,
+		['regex', 'matched', 'auto picks', 'calls/fwd', 'calls/auto', 'forward', 'auto'])
+
+
+if __name__ == '__main__' :
+	run()
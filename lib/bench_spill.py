@@ -0,0 +1,28 @@
+# Benchmark : in-memory vs bounded-memory frontier (spill.py) for broad patterns, time and peak frontier bytes
+from regex_nfa import *
+from seqs_store import TrieStore
+from bench_utils import timeit, load_words, report
+
+patterns = ['.+', '..+', '.a.+', '(b|c|d).+']
+ceilings = [2**20, 2**16]
+
+def run(repeat=3):
+	rx = Regex()
+	words = load_words()
+	store = TrieStore(words)
+	rows = []
+	for regex in patterns :
+		res, trace = rx.match(regex, store, max_steps=30, max_frontier_bytes=2**40, trace=True)
+		row = [regex, len(res or []), trace.totals()['max_frontier_bytes'], timeit(lambda: rx.match(regex, store, max_steps=30), repeat)]
+		for ceil in ceilings :
+			_, trace = rx.match(regex, store, max_steps=30, max_frontier_bytes=ceil, trace=True)
+			tot = trace.totals()
+			row += [tot['max_frontier_bytes'], tot['spilled'], timeit(lambda: rx.match(regex, store, max_steps=30, max_frontier_bytes=ceil), repeat)]
+		rows.append(tuple(row))
+	cols = ['regex', 'matched', 'peak/mem', 'in-memory']
+	for ceil in ceilings : cols += [f'peak/{ceil}', 'spilled', f'time/{ceil}']
+	report(f'match over {len(words)} words, frontier memory ceilings (bytes, sec)', rows, cols)
+
+
+if __name__ == '__main__' :
+	run()
@@ -0,0 +1,47 @@
+# Benchmark : SQLite store vs in-memory TrieStore at 1M+ sequences, load time and match time
+#  python bench_sqlite.py [number of sequences]
+import os
+import sys
+import time
+import tempfile
+from regex_nfa import *
+from seqs_store import TrieStore
+from sqlite_store import SQLiteStore
+from bench_utils import timeit, gen_words, gen_int_seqs, report
+
+patterns = {
+	'word': ['abc.+', 'x(y|z)..', 'q.e.', '(a|b)(c|d)e.+'],
+	'int' : [[1,2,'.','+'], [7,'.',7,'.'], [42,'(',1,'|',2,')','.','+']],
+}
+
+def run(n=1000000, repeat=3):
+	rx = Regex()
+	data = { 'word': gen_words(n, max_len=12), 'int': gen_int_seqs(n, vocab=100) }
+	with tempfile.TemporaryDirectory() as d :
+		for kind, seqs in data.items() :
+			t0 = time.perf_counter()
+			trie = TrieStore(seqs)
+			t_trie = time.perf_counter() - t0
+			path = os.path.join(d, f'{kind}.db')
+			t0 = time.perf_counter()
+			db = SQLiteStore(path).load(seqs)
+			t_db = time.perf_counter() - t0
+			report(f'load {len(seqs)} {kind} sequences (sec)', [(t_trie, t_db, os.path.getsize(path) // 2**20)], ['trie', 'sqlite', 'db MB'])
+
+			rows = []
+			for regex in patterns[kind] :
+				res = rx.match(regex, trie, max_steps=12)
+				assert sorted(map(str, res)) == sorted(map(str, rx.match(regex, db, max_steps=12)))
+				db.queries = 0
+				rx.match(regex, match_prefixes_fun=db.search_many, max_steps=12)
+				queries = db.queries
+				rows.append((str(regex)[:14], len(res),
+					timeit(lambda: rx.match(regex, trie, max_steps=12), repeat),
+					timeit(lambda: rx.match(regex, db, max_steps=12), repeat),
+					timeit(lambda: rx.match(regex, match_prefixes_fun=db.search_many, max_steps=12), repeat), queries))
+			report(f'match over {len(seqs)} {kind} sequences (sec)', rows, ['regex', 'matched', 'trie', 'sqlite', 'sqlite/many', 'queries/many'])
+			db.close()
+
+
+if __name__ == '__main__' :
+	run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
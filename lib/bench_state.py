@@ -0,0 +1,72 @@
+# Benchmark : slotted identity-hashed State graph vs. the old AttrDict graph,
+#  where every set-insert hashed str() of the whole reachable sub-automaton
+from regex_nfa import *
+from attr_dict import AttrDict
+from bench_utils import timeit, report
+
+class DictState(AttrDict) :
+	@property
+	def hasT(self): return 'T' in self
+	@property
+	def hasE(self): return 'E' in self
+	@property
+	def hasIsE(self): return 'is_end' in self
+	@property
+	def sym(self):
+		if self.hasT : return next(iter(self.T))
+		if self.hasIsE : return '!'
+		return '?'
+
+#rebuild a State graph as the old AttrDict graph
+def to_dict_graph(state, done=None):
+	if done is None : done = {}
+	if state in done : return done[state]
+	st = DictState({'is_end': True} if state.is_end else {})
+	done[state] = st
+	if state.hasT : st['T'] = AttrDict({ s: to_dict_graph(n, done) for s,n in state.T.items() })
+	if state.hasE : st['E'] = [ to_dict_graph(n, done) for n in state.E ]
+	return st
+
+def closure(state, next_states, visited):
+	if state.hasE :
+		for st in state.E :
+			if st not in visited :
+				visited.add(st)
+				closure(st, next_states, visited)
+	else : next_states.add(state)
+
+#same stepping as Regex.match_one, independent of the engine internals
+def simulate(start, seq):
+	current = set()
+	closure(start, current, set())
+	for symbol in seq :
+		nxt = set()
+		for state in current :
+			if not state.hasT or (symbol not in state.T and state.sym != ANY) : continue
+			closure(state.T[state.sym], nxt, set())
+		current = nxt
+	return any(s.hasIsE for s in current)
+
+patterns = [
+	('a(b|c)*d', 'a' + 'bc' * 20 + 'd'),
+	('(a|b)*c{2,8}', 'ab' * 20 + 'cccc'),
+	('[abc]+(x|y)?z', 'abc' * 10 + 'xz'),
+	('a{0,20}b+', 'a' * 15 + 'bbb'),
+	('((a|b)(c|d))*e', 'acbd' * 10 + 'e'),
+]
+
+def run(patterns, repeat=3):
+	n = Regex()
+	rows = []
+	for regex, seq in patterns :
+		nfa = n.to_nfa(regex)
+		legacy = to_dict_graph(nfa.start)
+		assert simulate(nfa.start, seq) == simulate(legacy, seq)
+		t_new = timeit(lambda: simulate(nfa.start, seq), repeat)
+		t_old = timeit(lambda: simulate(legacy, seq), repeat)
+		rows.append((regex, t_old, t_new, f'{t_old / t_new:.1f}x'))
+	report('match_one style simulation : AttrDict vs slotted State (sec)', rows, ['regex', 'attrdict', 'slotted', 'speedup'])
+
+
+if __name__ == '__main__' :
+	run(patterns)
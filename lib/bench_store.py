@@ -0,0 +1,33 @@
+# Benchmark : TrieStore vs. linear-scan db_search from 1e4 up to 1e7 sequences
+#    python bench_store.py [max_size]
+import sys
+import random
+from regex_nfa import *
+from seqs_store import db_search, TrieStore
+from bench_utils import timeit, gen_words, gen_int_seqs, report
+
+SCAN_MAX = 100000 #db_search is O(N) per call, skip it above this size
+
+def run(sizes, lookups=1000):
+	n = Regex()
+	rows = []
+	for size in sizes :
+		for kind, data, regex in [('str', gen_words(size), 'b.r..'), ('int', gen_int_seqs(size), [7,'.','.'])] :
+			rnd = random.Random(1)
+			probes = [ s[:rnd.randint(0, len(s)-1)] for s in rnd.sample(data, min(lookups, len(data))) ]
+			t_build = timeit(lambda: TrieStore(data), repeat=1)
+			store = TrieStore(data)
+			t_trie = timeit(lambda: [ store(p) for p in probes ], repeat=3) / len(probes)
+			t_match = timeit(lambda: n.match(regex, store), repeat=3)
+			t_scan = '-'
+			if size <= SCAN_MAX :
+				fun = partial(db_search, seqs=data)
+				t_scan = timeit(lambda: [ fun(p) for p in probes[:20] ], repeat=1) / 20
+			rows.append((f'{size:.0e}', kind, t_build, t_trie, t_scan, t_match))
+			del store
+	report('TrieStore scaling (sec, per-lookup for trie/scan)', rows, ['size', 'kind', 'build', 'trie', 'scan', 'match'])
+
+
+if __name__ == '__main__' :
+	top = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**6
+	run([ s for s in (10**4, 10**5, 10**6, 10**7) if s <= top ])
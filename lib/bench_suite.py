@@ -0,0 +1,95 @@
+# Reproducible benchmark suite : I2P.to_postfix, Regex.to_nfa, match_one and incremental match
+#  over a catalog of patterns (* + ? | {n,m} [...]) and synthetic corpora of words, int sequences
+#  and sentences at several sizes. Results are written as JSON if --out is given, compared with a baseline if given :
+#    python bench_suite.py --sizes 1e3,1e4,1e5 --out bench.json
+#    python bench_suite.py --baseline bench.json    #exit code 1 if anything got slower than tolerance
+import sys
+import json
+import time
+import argparse
+import platform
+from regex_nfa import *
+from seqs_store import TrieStore
+from bench_utils import timeit, gen_words, gen_int_seqs, gen_sents
+
+SEED = 42
+
+corpora = {
+	'word': lambda n : gen_words(n, SEED),
+	'int' : lambda n : gen_int_seqs(n, SEED, vocab=50),
+	'sent': lambda n : gen_sents(n, SEED),
+}
+
+#pattern catalog per corpus kind, sentences use tokens of the generated vocabulary
+def catalog(kind):
+	if kind == 'word' :
+		return ['ab*c', 'a+b.', 'ab?c.', '(ab|cd)e.', 'a{1,3}z.', '[abc]x.+', 'w(h|o).+', 'q.e.?']
+	if kind == 'int' :
+		return [[1,2,'*',3], [1,'+',2,'.'], [1,2,'?',3,'.'], ['(',1,'|',2,')',3,'.'], [1,'{1,3}',5,'.'], [7,'.','+']]
+	w = sorted({ t for s in gen_sents(1000, SEED) for t in s })
+	return [[w[0],'.','+'], [w[0],w[1],'*',w[2]], ['(',w[0],'|',w[1],')','.','?'], [w[3],'{1,3}','.'], [w[4],'.',w[5],'.']]
+
+def key(r): return (r['bench'], r['kind'], str(r['pattern']), r['size'])
+
+def run(sizes, repeat=3, max_one=100000, max_steps=12):
+	rx, i2p = Regex(), I2P()
+	results = []
+	def add(bench, kind, pattern, size, secs, **extra):
+		results.append(dict(bench=bench, kind=kind, pattern=str(pattern), size=size, seconds=secs, **extra))
+		print(f'{bench:>10} {kind:>5} {str(pattern)[:28]:>28} {size:>9} {secs:12.6f}')
+
+	for kind, gen in corpora.items() :
+		patterns = catalog(kind)
+		#parse and build, independent of the corpus size, repeated to be measurable
+		for p in patterns :
+			infix = rx.normalize(p)
+			infix = infix if isi(infix, str) else list(infix)
+			add('to_postfix', kind, p, 0, timeit(lambda: [ i2p.to_postfix(infix) for _ in range(1000) ], repeat) / 1000)
+			add('to_nfa', kind, p, 0, timeit(lambda: [ rx.to_nfa(infix) for _ in range(100) ], repeat) / 100)
+		for size in sizes :
+			seqs = gen(size)
+			sample = seqs[:max_one]
+			store = TrieStore(seqs)
+			for p in patterns :
+				rx.compile(p)
+				matched = sum(rx.match_one(p, s) for s in sample)
+				add('match_one', kind, p, size, timeit(lambda: [ rx.match_one(p, s) for s in sample ], repeat), seqs=len(sample), matched=matched)
+				res = rx.match(p, store, max_steps=max_steps)
+				add('match', kind, p, size, timeit(lambda: rx.match(p, store, max_steps=max_steps), repeat), matched=len(res or []))
+	return results
+
+#results slower than baseline * (1 + tolerance), ignoring timings under min_time seconds
+def regressions(results, baseline, tolerance=0.25, min_time=1e-3):
+	base = { key(r) : r['seconds'] for r in baseline['results'] }
+	slow = []
+	for r in results :
+		b = base.get(key(r))
+		if b is None or max(b, r['seconds']) < min_time : continue
+		if r['seconds'] > b * (1 + tolerance) : slow.append(dict(r, baseline=b, ratio=r['seconds'] / b))
+	return slow
+
+
+if __name__ == '__main__' :
+	ap = argparse.ArgumentParser()
+	ap.add_argument('--sizes', default='1e3,1e4,1e5', help='corpus sizes, up to 1e7')
+	ap.add_argument('--repeat', type=int, default=5)
+	ap.add_argument('--out', default=None, help='JSON file to write the results to')
+	ap.add_argument('--baseline', default=None, help='JSON of a previous run to compare with')
+	ap.add_argument('--tolerance', type=float, default=0.25)
+	ap.add_argument('--min-time', type=float, default=1e-3, help='timings under it are too noisy to compare')
+	args = ap.parse_args()
+
+	sizes = [ int(float(s)) for s in args.sizes.split(',') ]
+	t0 = time.perf_counter()
+	results = run(sizes, args.repeat)
+	meta = { 'python': platform.python_version(), 'machine': platform.machine(), 'sizes': sizes,
+		'seed': SEED, 'repeat': args.repeat, 'time': time.perf_counter() - t0 }
+	if args.out is not None :
+		with open(args.out, 'w') as f : json.dump({ 'meta': meta, 'results': results }, f, indent=1)
+		print(f'\n{len(results)} results written to {args.out}')
+
+	if args.baseline is not None :
+		with open(args.baseline) as f : slow = regressions(results, json.load(f), args.tolerance, args.min_time)
+		for r in slow : print(f"REGRESSION: {r['bench']} {r['kind']} {r['pattern']} {r['size']} : {r['baseline']:.6f} -> {r['seconds']:.6f} ({r['ratio']:.2f}x)")
+		print(f'\n::  REGRESSIONS:{len(slow)}')
+		sys.exit(1 if len(slow) > 0 else 0)
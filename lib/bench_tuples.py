@@ -0,0 +1,62 @@
+# Microbenchmark : tuple-carried list prefixes vs. the old str()/eval() round-trip
+#  on the seqs/sents fixtures scaled up
+import random
+from regex_nfa import *
+from seqs_store import seqs, sents, TrieStore
+from bench_utils import timeit, report
+
+#filter_sas as it was, dedupe via str(seq) and eval() of the survivors
+def filter_sas_eval(states, symsOseqs):
+	filtered_states, filtered_syms = set(), set()
+	for syms in symsOseqs :
+		for seq in syms :
+			for state in states :
+				if state.sym == ANY or state.sym == seq[-1] :
+					filtered_states.add(state)
+					filtered_syms.add(str(seq))
+	return list(filtered_states), [ eval(s) for s in filtered_syms ]
+
+#same global filter, list sequences carried as tuples
+def filter_sas_tuple(states, symsOseqs):
+	filtered_states, filtered_syms = set(), set()
+	for syms in symsOseqs :
+		for seq in syms :
+			for state in states :
+				if state.sym == ANY or state.sym == seq[-1] :
+					filtered_states.add(state)
+					filtered_syms.add(seq)
+	return list(filtered_states), list(filtered_syms)
+
+#grow a fixture to n sequences by mutating copies of its items, with a wider vocabulary
+def scale(fixture, n, seed=42, extra=500):
+	rnd = random.Random(seed)
+	vocab = sorted({ s for seq in fixture for s in seq }, key=str)
+	vocab += [ (100 + i if isi(vocab[0], int) else f'tok{i}') for i in range(extra) ]
+	out = []
+	for i in range(n) :
+		seq = list(rnd.choice(fixture))
+		seq[rnd.randrange(len(seq))] = rnd.choice(vocab)
+		out.append(seq + [ rnd.choice(vocab) for _ in range(rnd.randint(0, 3)) ])
+	return out
+
+def run(n=50000, repeat=3):
+	rx = Regex()
+	rows = []
+	for name, fixture in [('seqs', seqs), ('sents', sents)] :
+		data = scale(fixture, n)
+		store = TrieStore(data)
+		#one wide step : all second-level prefixes
+		states = [ s for s in rx.compile(['.','.','+']).states if s.hasT ]
+		as_lists = [ store(list(p)) for p in store(()) ]
+		as_tuples = [ store(p) for p in store(()) ]
+		assert sorted(map(tuple, filter_sas_eval(states, as_lists)[1])) == sorted(filter_sas_tuple(states, as_tuples)[1])
+		t_eval = timeit(lambda: filter_sas_eval(states, as_lists), repeat)
+		t_tup = timeit(lambda: filter_sas_tuple(states, as_tuples), repeat)
+		regex = [fixture[0][0], '.', '+']
+		t_match = timeit(lambda: rx.match(regex, store), repeat)
+		rows.append((name, sum(map(len, as_tuples)), t_eval, t_tup, f'{t_eval / t_tup:.1f}x', t_match))
+	report(f'filter_sas on {n} scaled sequences (sec)', rows, ['fixture', 'prefixes', 'str/eval', 'tuples', 'speedup', 'match'])
+
+
+if __name__ == '__main__' :
+	run()
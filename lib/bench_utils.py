@@ -0,0 +1,51 @@
+import gc
+import os
+import time
+import random
+import string
+
+isi = isinstance
+
+DICT_WORDS = '/usr/share/dict/words'
+
+#best-of-N wall time of fun() in seconds, with the garbage collector off like the stdlib timeit
+def timeit(fun, repeat=3, number=1):
+	best = None
+	enabled = gc.isenabled()
+	gc.disable()
+	try :
+		for _ in range(repeat) :
+			t0 = time.perf_counter()
+			for _ in range(number) : fun()
+			t = (time.perf_counter() - t0) / number
+			if best is None or t < best : best = t
+	finally :
+		if enabled : gc.enable()
+	return best
+
+#synthetic dictionary-like words (sorted, so the same for every run), used when the system words file is missing
+def gen_words(n, seed=42, alphabet=string.ascii_lowercase, min_len=2, max_len=10):
+	rnd = random.Random(seed)
+	return sorted({ ''.join(rnd.choice(alphabet) for _ in range(rnd.randint(min_len, max_len))) for _ in range(n) })
+
+def load_words(path=DICT_WORDS, n=100000, seed=42):
+	if os.path.exists(path) :
+		with open(path) as f : return [ l.rstrip() for l in f.readlines() ]
+	return gen_words(n, seed)
+
+def report(title, rows, cols):
+	print(f'\n>> {title}')
+	print(' | '.join(f'{c:>12}' for c in cols))
+	for r in rows :
+		print(' | '.join((f'{v:>12.6f}' if isi(v, float) else f'{str(v):>12}') for v in r))
+
+#synthetic integer-token sequences
+def gen_int_seqs(n, seed=42, vocab=1000, min_len=2, max_len=8):
+	rnd = random.Random(seed)
+	return [ [ rnd.randrange(vocab) for _ in range(rnd.randint(min_len, max_len)) ] for _ in range(n) ]
+
+#synthetic sentences : token lists over a small vocabulary of words
+def gen_sents(n, seed=42, vocab=200, min_len=2, max_len=8):
+	rnd = random.Random(seed)
+	words = gen_words(vocab, seed, min_len=2, max_len=6)
+	return [ [ rnd.choice(words) for _ in range(rnd.randint(min_len, max_len)) ] for _ in range(n) ]
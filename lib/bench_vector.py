@@ -0,0 +1,29 @@
+# Benchmark : vectorized match_many vs. a Python loop of match_one
+#    python bench_vector.py [size]
+import sys
+import random
+from regex_nfa import *
+from vector_match import Corpus
+from bench_utils import timeit, gen_words, gen_int_seqs, report
+
+def run(size, repeat=3):
+	rx = Regex()
+	rows = []
+	sents = [ [ w for w in random.Random(i).choices(['hi','hey','world','buddy','ho'], k=(i % 5) + 1) ] for i in range(size) ]
+	for kind, data, patterns in [
+			('str', gen_words(size), ['wh..', 'w(h|o).+', '[abc]+x?z', 'b.{2,5}r']),
+			('int', gen_int_seqs(size, vocab=50), [[7,'.','.'], ['(',1,'|',2,')','.','+',4]]),
+			('word', sents, [['hi','+','world'], ['(','hi','|','hey',')','.','{1,3}']]) ] :
+		t_enc = timeit(lambda: Corpus(data), repeat=1)
+		corpus = Corpus(data)
+		for regex in patterns :
+			mask = rx.match_many(regex, corpus)
+			assert mask.tolist() == [ rx.match_one(regex, s, dfa=True) for s in data ]
+			t_loop = timeit(lambda: [ rx.match_one(regex, s, dfa=True) for s in data ], 1)
+			t_vec = timeit(lambda: rx.match_many(regex, corpus), repeat)
+			rows.append((kind, str(regex)[:12], int(mask.sum()), t_enc, t_loop, t_vec, f'{t_loop / t_vec:.1f}x'))
+	report(f'match_many over {len(data)} sequences (sec)', rows, ['kind', 'regex', 'matched', 'encode', 'loop(dfa)', 'vector', 'speedup'])
+
+
+if __name__ == '__main__' :
+	run(int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**6)
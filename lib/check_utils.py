@@ -0,0 +1,19 @@
+# PASS/FAIL bookkeeping shared by the test_*.py scripts
+#    check = Checks()
+#    check('literal', res == expected) #prints PASS:literal or FAIL:literal
+#    check.summary() #prints ::  PASSED:x, FAILED:y
+
+class Checks(object):
+
+	def __init__(self):
+		self.passed = self.failed = 0
+
+	def __call__(self, msg, res):
+		print(('PASS:' if res else 'FAIL:') + msg)
+		if res : self.passed += 1
+		else : self.failed += 1
+		return res
+
+	#extra : more stats at the end of the line
+	def summary(self, extra=''):
+		print(f"\n\n::  PASSED:{self.passed}, FAILED:{self.failed}{extra}\n")
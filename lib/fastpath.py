@@ -0,0 +1,63 @@
+# Fast path for fixed-length patterns : literals ('why'), wildcard masks ('wh..', 'wh.r..') and
+#  single-symbol classes ('[bc]at', 'wh[ae]t'), i.e. postfix made only of symbols, ANY, [class], CAT and {n}.
+#  The k-th symbol of a match is one of positions[k] (None for ANY), so match_one() and match_many()
+#  check positions instead of stepping NFA/DFA states. match() over a store does not use it : the store
+#  lookups dominate there and the per-position check measured no faster than the cached NFA transitions
+from infix2postfix import CAT, ANY
+
+isi = isinstance
+
+#per position accepted symbols (frozenset or None for ANY), None if the pattern is not fixed-length
+def fixed_positions(postfix):
+	if postfix is None or len(postfix) == 0 : return None
+	stack = []
+	for token in postfix :
+		if token == CAT :
+			if len(stack) < 2 : return None
+			right = stack.pop()
+			stack[-1] = stack[-1] + right
+		elif isi(token, int) : stack.append((frozenset([token]),))
+		elif token == ANY : stack.append((None,))
+		elif token.startswith('[') : stack.append((frozenset(token.replace('[','').replace(']','')),))
+		elif token.startswith('{') : # x{n} is n times x
+			nm = token[1:-1].split(',')
+			if len(stack) == 0 or (len(nm) == 2 and nm[1] != nm[0]) : return None
+			stack[-1] = stack[-1] * int(nm[0] or 0)
+		elif token in ('*', '?', '+', '|') : return None
+		else : stack.append((frozenset([token]),))
+	return stack[0] if len(stack) == 1 and len(stack[0]) > 0 else None
+
+
+class Fixed(object):
+	__slots__ = ('positions', 'kind', 'literal', 'is_str')
+
+	#kind : 'literal' one symbol per position, 'mask' also ANY, 'class' also [class]
+	#  literal : the symbols up to the first non-single position
+	def __init__(self, positions, is_str):
+		self.positions, self.is_str = positions, is_str
+		single = [ p is not None and len(p) == 1 for p in positions ]
+		self.kind = 'literal' if all(single) else 'mask' if all( s or p is None for s, p in zip(single, positions) ) else 'class'
+		lit = []
+		for s, p in zip(single, positions) :
+			if not s : break
+			lit.append(next(iter(p)))
+		self.literal = ''.join(lit) if is_str else tuple(lit)
+
+	def __len__(self): return len(self.positions)
+
+	#literals by length and startswith i.e. equality, the others also check the positions after the literal
+	def match_one(self, seq):
+		if len(seq) != len(self.positions) : return False
+		lit = self.literal
+		if self.is_str and isi(seq, str) :
+			if not seq.startswith(lit) : return False
+		else :
+			seq, lit = tuple(seq), tuple(lit)
+			if seq[:len(lit)] != lit : return False
+		if self.kind == 'literal' : return True
+		n = len(lit)
+		for sym, syms in zip(seq[n:], self.positions[n:]) :
+			if syms is not None and sym not in syms : return False
+		return True
+
+	def __repr__(self): return f'Fixed({self.kind}, {len(self.positions)})'
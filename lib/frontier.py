@@ -0,0 +1,92 @@
+# Frontier policies : which prefixes of a step are expanded through the store
+#  A policy keeps per-match counters, start() resets them, so don't share one between concurrent matches
+#    Policy()            : keep everything
+#    Cap(limit)          : the first limit prefixes in a deterministic (sorted) order
+#    Beam(width, score)  : the width best prefixes by a store-supplied score, e.g. TrieStore.count
+#    Budget(max_calls, max_prefixes, policy) : global caps on store calls and expanded prefixes
+#                          for the whole match, on top of another policy. A match stopped by the budget
+#                          returns the results found so far (maybe []), budget.cut > 0 tells it apart from no match
+
+isi = isinstance
+
+#deterministic sort key for str prefixes or tuples of mixed symbols (ints, words ...)
+def seq_key(seq):
+	if isi(seq, str) : return seq
+	return tuple( (s.__class__.__name__, s) for s in seq )
+
+def first(frontier, n, key=seq_key):
+	return { p : frontier[p] for p in sorted(frontier, key=key)[:max(n, 0)] }
+
+
+class Policy(object):
+
+	def start(self, batched=False):
+		self.batched = batched
+		self.calls = self.expanded = 0
+
+	#the part of the frontier to expand in the next step
+	def select(self, frontier): return frontier
+
+	#called after every step with the number of prefixes looked up
+	def spent(self, prefixes):
+		if prefixes == 0 : return
+		self.calls += 1 if self.batched else prefixes
+		self.expanded += prefixes
+
+
+class Cap(Policy):
+
+	def __init__(self, limit): self.limit = limit
+
+	def select(self, frontier):
+		if len(frontier) <= self.limit : return frontier
+		return first(frontier, self.limit)
+
+
+class Beam(Policy):
+
+	#score(prefix) => number, higher is better
+	def __init__(self, width, score):
+		self.width, self.score = width, score
+
+	def select(self, frontier):
+		if len(frontier) <= self.width : return frontier
+		score = self.score
+		return first(frontier, self.width, key=lambda p : (-score(p), seq_key(p)))
+
+
+class Budget(Policy):
+
+	def __init__(self, max_calls=None, max_prefixes=None, policy=None):
+		self.max_calls, self.max_prefixes = max_calls, max_prefixes
+		self.policy = Policy() if policy is None else policy
+
+	def start(self, batched=False):
+		super().start(batched)
+		self.policy.start(batched)
+		self.cut = 0 # prefixes dropped because the budget ran out
+
+	#did the budget stop the match before it ran out of prefixes
+	@property
+	def truncated(self): return self.cut > 0
+
+	@property
+	def exhausted(self):
+		return (self.max_calls is not None and self.calls >= self.max_calls) or \
+			(self.max_prefixes is not None and self.expanded >= self.max_prefixes)
+
+	def select(self, frontier):
+		frontier = self.policy.select(frontier)
+		if self.exhausted :
+			self.cut += len(frontier)
+			return {}
+		left = len(frontier)
+		if self.max_prefixes is not None : left = min(left, self.max_prefixes - self.expanded)
+		if self.max_calls is not None and not self.batched : left = min(left, self.max_calls - self.calls)
+		if left >= len(frontier) : return frontier
+		self.cut += len(frontier) - left
+		return first(frontier, left)
+
+	def spent(self, prefixes):
+		super().spent(prefixes)
+		self.policy.spent(prefixes)
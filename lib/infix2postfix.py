@@ -39,7 +39,7 @@ class I2P(object):
 
 			last = token if isi(token,int) else token[-1]
 
-			if ( (isym(token) or token in '?+*).' or last in '}]' ) and ( isym(peek) or peek in '(.' ) ) :
+			if ( (isym(token) or token in '?+*).' or last in '}]' ) and ( isym(peek) or peek in '(.' or peek[0] == '[' ) ) :
 				  # or ( isi(token,str) and (token == ')' or last in ']') and  peek[0] in '{') ) :
 				# say(f'{token} => {peek} : {last} #')
 				rv.extend([token, CAT]) 
@@ -0,0 +1,57 @@
+# Literal analysis of a postfix regex : the literal runs every match must contain
+#  Every sub-expression is summarized as (exact, prefix, suffix, required) :
+#    exact    : the only sequence it matches or None
+#    prefix   : literal every match starts with,  suffix : literal every match ends with
+#    required : literals every match contains
+#  symbols/literals are tuples, so this works for strings, numbers and words alike
+from infix2postfix import CAT, ANY
+
+isi = isinstance
+
+NONE = (None, (), (), []) # matches anything/nothing mandatory
+
+#is sub a contiguous part of seq
+def contains(seq, sub):
+	if isi(seq, str) and isi(sub, str) : return sub in seq
+	seq, n = tuple(seq), len(sub)
+	return any(seq[i:i+n] == tuple(sub) for i in range(len(seq) - n + 1))
+
+def repeated(x): #X+ or X{n,m} with n > 0
+	exact, prefix, suffix, req = x
+	return (None, prefix, suffix, req + ([exact] if exact else []))
+
+def concat(a, b):
+	ea, pa, sa, ra = a
+	eb, pb, sb, rb = b
+	exact = ea + eb if ea is not None and eb is not None else None
+	prefix = ea + pb if ea is not None else pa
+	suffix = sa + eb if eb is not None else sb
+	return (exact, prefix, suffix, ra + rb + [sa + pb])
+
+def required_literals(postfix):
+	stack = []
+	for token in postfix :
+		op = token if isi(token, str) else None
+		if op in ('*', '?') :
+			stack.pop()
+			stack.append(NONE)
+		elif op == '+' : stack.append(repeated(stack.pop()))
+		elif op == '|' :
+			stack.pop(); stack.pop()
+			stack.append(NONE)
+		elif op == CAT :
+			b = stack.pop()
+			stack.append(concat(stack.pop(), b))
+		elif op is not None and op.startswith('{') :
+			x = stack.pop()
+			n = int(op[1:-1].split(',')[0] or 0)
+			stack.append(repeated(x) if n > 0 else NONE)
+		elif op == ANY or (op is not None and op.startswith('[')) : stack.append(NONE)
+		else : stack.append(((token,), (token,), (token,), []))
+
+	if len(stack) != 1 : return ()
+	exact, prefix, suffix, req = stack[0]
+	lits = { l for l in req + [exact or (), prefix, suffix] if len(l) > 0 }
+	#keep only the maximal ones, longest first
+	lits = [ l for l in lits if not any(l != o and contains(o, l) for o in lits) ]
+	return tuple(sorted(lits, key=lambda l : (-len(l), str(l))))
@@ -0,0 +1,70 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+# Bounded Least-Recently-Used cache with hit/miss/eviction counters
+#  ttl : entries older than ttl seconds are dropped on access (counted as expirations)
+#  sizeof : bytes of a value, counted in bytes when given
+#  maxbytes : also evict while the total bytes of the entries are over maxbytes
+class LRU(object):
+
+	def __init__(self, maxsize=512, ttl=None, maxbytes=None, sizeof=None, clock=time.monotonic):
+		self.maxsize = maxsize
+		self.ttl, self.maxbytes, self.sizeof, self.clock = ttl, maxbytes, sizeof, clock
+		self.data = OrderedDict()
+		self.born, self.sizes = {}, {} # key => put time, key => bytes, only with ttl/maxbytes
+		self.bytes = 0
+		self.lock = Lock()
+		self.hits = self.misses = self.evictions = self.expirations = 0
+
+	def __len__(self): return len(self.data)
+	def __contains__(self, key): return key in self.data
+
+	def get(self, key, default=None):
+		with self.lock :
+			if key in self.data :
+				if self.ttl is not None and self.clock() - self.born[key] > self.ttl :
+					self._drop(key)
+					self.expirations += 1
+				else :
+					self.data.move_to_end(key)
+					self.hits += 1
+					return self.data[key]
+			self.misses += 1
+			return default
+
+	def put(self, key, value):
+		with self.lock :
+			if key in self.data : self._drop(key)
+			self.data[key] = value
+			if self.ttl is not None : self.born[key] = self.clock()
+			if self.sizeof is not None :
+				self.sizes[key] = self.sizeof(value)
+				self.bytes += self.sizes[key]
+			while len(self.data) > 0 and ((self.maxsize is not None and len(self.data) > self.maxsize)
+					or (self.maxbytes is not None and self.bytes > self.maxbytes)) :
+				self._drop(next(iter(self.data)))
+				self.evictions += 1
+
+	def _drop(self, key):
+		self.born.pop(key, None)
+		self.bytes -= self.sizes.pop(key, 0)
+		return self.data.pop(key)
+
+	def pop(self, key, default=None):
+		with self.lock : return self._drop(key) if key in self.data else default
+
+	#drop the entries, the counters keep going (see reset_stats())
+	def clear(self):
+		with self.lock :
+			self.data.clear()
+			self.born.clear()
+			self.sizes.clear()
+			self.bytes = 0
+
+	def reset_stats(self):
+		with self.lock : self.hits = self.misses = self.evictions = self.expirations = 0
+
+	def stats(self):
+		return { 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'expirations': self.expirations,
+			'size': len(self.data), 'maxsize': self.maxsize }
@@ -0,0 +1,132 @@
+# On-disk compact corpus : the sequences encoded as symbol ids, sorted and concatenated in one
+#  array + an offsets array, opened with NumPy memmap. Opening does not read the data, the
+#  pages are loaded on use by the OS and shared by all the processes that open the same files
+#    MmapCorpus.build(words, 'words.mm')
+#    n.match('wh.r..', MmapCorpus('words.mm'))
+# The sequences with a common prefix are a contiguous range of rows, found by binary search
+#  one symbol at a time, so a lookup reads only the symbols it compares and never whole sequences
+import sys
+sys.path.extend(["../"])
+
+import os
+import json
+try :
+	import numpy as np
+except ImportError : # optional dependency, only needed for MmapCorpus
+	np = None
+
+from lru import LRU
+from seqs_store import Store
+
+isi = isinstance
+
+class MmapCorpus(Store):
+
+	DATA, OFFSETS, SYMS = 'data.npy', 'offsets.npy', 'syms.json'
+
+	#path : directory written by build()
+	#  ranges : how many prefix => row-range entries to cache, Regex.match() extends the prefixes
+	#  of the previous step, so their ranges are narrowed from the cached ones
+	def __init__(self, path, ranges=100000):
+		if np is None : raise ImportError('MmapCorpus requires numpy')
+		self.path = path
+		self.data = np.load(os.path.join(path, self.DATA), mmap_mode='r')
+		self.offsets = np.load(os.path.join(path, self.OFFSETS), mmap_mode='r')
+		with open(os.path.join(path, self.SYMS)) as f : meta = json.load(f)
+		self.kind, self.syms = meta['kind'], meta['syms'] # id => symbol
+		self.ids = { s : i for i, s in enumerate(self.syms) }
+		self.size = len(self.offsets) - 1
+		self.ranges = LRU(maxsize=ranges)
+
+	#workers re-open the files instead of copying the arrays, see parallel.match_sharded()
+	def __reduce__(self): return (MmapCorpus, (self.path, self.ranges.maxsize))
+
+	def __len__(self): return self.size
+
+	#Encode, deduplicate and sort the sequences, write them under path
+	#  symbol ids follow the sort order of the symbols (by type name first, so mixed ints and words sort),
+	#  so the rows are sorted as the sequences. kind is taken from the first non-empty sequence
+	@staticmethod
+	def build(seqs, path, dtype='int32'):
+		if np is None : raise ImportError('MmapCorpus requires numpy')
+		seqs = list(seqs)
+		sample = next(( seq for seq in seqs if len(seq) > 0 ), '')
+		kind = 'str' if isi(sample, str) else 'int' if isi(sample[0], int) else 'word'
+		syms = sorted({ s for seq in seqs for s in seq }, key=lambda s : (type(s).__name__, s))
+		ids = { s : i for i, s in enumerate(syms) }
+		rows = sorted({ tuple(ids[s] for s in seq) for seq in seqs })
+		lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+		offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+		np.cumsum(lengths, out=offsets[1:])
+		data = np.fromiter((i for r in rows for i in r), dtype=dtype, count=int(offsets[-1]))
+		os.makedirs(path, exist_ok=True)
+		np.save(os.path.join(path, MmapCorpus.DATA), data)
+		np.save(os.path.join(path, MmapCorpus.OFFSETS), offsets)
+		with open(os.path.join(path, MmapCorpus.SYMS), 'w') as f : json.dump({ 'kind': kind, 'syms': syms }, f)
+		return MmapCorpus(path)
+
+	#symbol id at position j of row i, -1 past its end (so the shorter row sorts first)
+	def at(self, i, j):
+		o = int(self.offsets[i]) + j
+		return int(self.data[o]) if o < self.offsets[i+1] else -1
+
+	def row(self, i):
+		seq = [ self.syms[s] for s in self.data[self.offsets[i]:self.offsets[i+1]].tolist() ]
+		return ''.join(seq) if self.kind == 'str' else seq
+
+	#rows lo..hi share the first j symbols, the sub-range with symbol sid at j
+	def narrow(self, lo, hi, j, sid):
+		a, b = lo, hi
+		while a < b :
+			m = (a + b) // 2
+			if self.at(m, j) < sid : a = m + 1
+			else : b = m
+		start, b = a, hi
+		while a < b :
+			m = (a + b) // 2
+			if self.at(m, j) <= sid : a = m + 1
+			else : b = m
+		return start, a
+
+	#row range of the sequences starting with the symbol ids, cached per prefix
+	def range(self, ids):
+		if len(ids) == 0 : return 0, self.size
+		rng = self.ranges.get(ids)
+		if rng is None :
+			lo, hi = self.range(ids[:-1])
+			rng = (lo, hi) if lo == hi else self.narrow(lo, hi, len(ids) - 1, ids[-1])
+			self.ranges.put(ids, rng)
+		return rng
+
+	def encode(self, prefix):
+		ids = tuple( self.ids.get(s, -2) for s in prefix )
+		return None if -2 in ids else ids
+
+	#next symbols after the prefix, end-of-sequence is reported as 'end'
+	#  allowed : look up only these symbols, one narrow() each
+	def children(self, prefix, end='.', allowed=None):
+		ids = self.encode(prefix)
+		if ids is None : return []
+		lo, hi = self.range(ids)
+		k, res = len(ids), []
+		if lo < hi and self.at(lo, k) == -1 : # the prefix itself is a sequence
+			if allowed is None or end in allowed : res.append(end)
+			lo += 1
+		if allowed is not None :
+			for sid in sorted( self.ids[s] for s in allowed if s in self.ids ) :
+				if lo == hi : break
+				a, b = self.range(ids + (sid,))
+				if a < b : res.append(self.syms[sid])
+			return res
+		while lo < hi :
+			sid = self.at(lo, k)
+			res.append(self.syms[sid])
+			lo = self.narrow(lo, hi, k, sid)[1]
+		return res
+
+	#number of sequences starting with prefix, usable as frontier.Beam score
+	def count(self, prefix):
+		ids = self.encode(prefix)
+		if ids is None : return 0
+		lo, hi = self.range(ids)
+		return hi - lo
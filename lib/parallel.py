@@ -0,0 +1,96 @@
+# Parallel incremental match over a sequence store sharded in many stores
+#  The pattern is compiled once and shipped to the worker processes, every step the
+#  frontier of each shard is expanded in a worker (store lookups + NFA advance) and
+#  the driver merges the results, so limit is applied across all the shards
+import sys
+sys.path.extend(["../"])
+
+import time
+from multiprocessing import Pool
+
+from regex_nfa import *
+from frontier import seq_key
+
+#process-local worker state
+_worker = {}
+
+def _init(pattern, shards, factory):
+	_worker.update(pattern=pattern, shards=shards, factory=factory, stores={}, trans={}, hints={}, filters={})
+
+#the match_prefix_fun of a shard, created on first use when there is a factory
+def _store(i):
+	stores = _worker['stores']
+	if i not in stores :
+		spec, factory = _worker['shards'][i], _worker['factory']
+		stores[i] = spec if factory is None else factory(spec)
+	return stores[i]
+
+#one BFS step of one shard : (shard, full seqs, next frontier, lookups, seconds)
+def _step(args):
+	i, frontier, head, end = args
+	t0 = time.perf_counter()
+	rx = Regex()
+	store = _store(i)
+	pattern = _worker['pattern']
+	if i not in _worker['hints'] : _worker['hints'][i] = (rx.store_hints(pattern, store), rx.takes(store, 'allowed'))
+	hints, pushdown = _worker['hints'][i]
+	prefixes = list(frontier)
+	allowed = rx.allowed_syms(pattern, frontier, prefixes, end, _worker['filters']) if pushdown else None
+	preds = rx.next_seq_syms(prefixes, fun=store, head=head, end=end, allowed=allowed, **hints)
+	full_seqs, frontier = rx.filter_sas(pattern, frontier, prefixes, preds, end, _worker['trans'])
+	return i, full_seqs, frontier, len(prefixes), time.perf_counter() - t0
+
+#keep at most limit prefixes in total, taken round-robin from the shards in sorted order
+def cap(frontiers, limit):
+	items = [ sorted(f.items(), key=lambda kv : seq_key(kv[0])) for f in frontiers ]
+	capped = [ {} for _ in frontiers ]
+	for k in range(max(map(len, items), default=0)) :
+		for i, its in enumerate(items) :
+			if k >= len(its) : continue
+			if limit == 0 : return capped
+			capped[i][its[k][0]] = its[k][1]
+			limit -= 1
+	return capped
+
+# Same as Regex.match() but across shards :
+#  shards  : list of match_prefix_funs, or of specs passed to factory(spec) in the worker
+#            (use a factory when the store can not be pickled, e.g. DB connections)
+#  processes : size of the process pool, 0 runs everything in the calling process
+# Returns (full_seqs, stats), stats has the per-shard lookups and time
+def match_sharded(regex, shards, factory=None, head=None, limit=None, max_steps=10, end='.', processes=None):
+	rx = Regex()
+	pattern = rx.compile(regex)
+	head, frontier, _ = rx.start_frontier(pattern, head)
+	frontiers = [ dict(frontier) for _ in shards ]
+	stats = { 'steps': 0, 'time': 0.0, 'shards': [ { 'calls': 0, 'time': 0.0 } for _ in shards ] }
+
+	t0 = time.perf_counter()
+	pool = None
+	if processes == 0 : _init(pattern, shards, factory)
+	else : pool = Pool(processes, initializer=_init, initargs=(pattern, shards, factory))
+	try :
+		full_seqs = None
+		for step in range(max_steps + 1) :
+			work = [ (i, f, head if step == 0 else None, end) for i, f in enumerate(frontiers) if len(f) > 0 ]
+			results = map(_step, work) if pool is None else pool.imap_unordered(_step, work)
+			found = {}
+			for i, full, frontier, calls, secs in results :
+				frontiers[i] = frontier
+				found[i] = full
+				stats['shards'][i]['calls'] += calls
+				stats['shards'][i]['time'] += secs
+			stats['steps'] = step + 1
+
+			#merge in shard order, the same sequence may live in more than one shard
+			full_seqs = list(dict.fromkeys( s for i in sorted(found) for s in found[i] ))
+			if len(full_seqs) > 0 or all(len(f) == 0 for f in frontiers) : break
+			full_seqs = None
+			if limit is not None : frontiers = cap(frontiers, limit)
+	finally :
+		if pool is not None :
+			pool.close()
+			pool.join()
+
+	stats['time'] = time.perf_counter() - t0
+	if full_seqs is not None and not pattern.is_str : full_seqs = [ list(s) for s in full_seqs ]
+	return full_seqs, stats
@@ -1,63 +1,90 @@
 import sys
 sys.path.extend(["../"])
 	
+import time
+import asyncio
 from collections import deque
-from attr_dict import AttrDict
+from itertools import count
 from pp import *
 from functools import partial
+from contextlib import closing
+from inspect import signature
 
 from infix2postfix import *
+from lru import LRU
+from frontier import Policy, Cap
+from literals import required_literals
+from fastpath import Fixed, fixed_positions
+from tracing import Trace
+from spill import SpillFrontier
+from vector_match import Corpus, match_many as vector_match_many
 
 isi = isinstance
 
 #============== NFA ==========================================================
 
-class Symbol(AttrDict): pass
+class Symbol(dict): pass
 
 
 # A State holds :
 #   Either Symbol OR 1 or 2 Epsilon transition
 #   and/or flag which specifies if this is end-state
-class State(AttrDict) :
+#   C : counter operation of the epsilon transitions of {n,m}, see OPS.n2m()
+# States are slotted and hashed by identity, so adding them to a set
+#  does not serialize the reachable sub-automaton
+class State(object) :
+	__slots__ = ('id', 'T', 'E', 'is_end', 'C')
+
+	ids = count() #unique integer state ids
+
+	def __init__(self, is_end=False):
+		self.id = next(State.ids)
+		self.T = None
+		self.E = None
+		self.is_end = is_end
+		self.C = None
 
 	@classmethod
-	def new(cls, is_end):
-		if is_end :	return State({'is_end': is_end })
-		return State({})
-		# return State( {'is_end': is_end, 'T': Symbol({}), 'E': [] } )
+	def new(cls, is_end): return cls(is_end)
 
 	#exist fields checks
 	@property
-	def hasT(self): return 'T' in self
+	def hasT(self): return self.T is not None
 	@property
-	def hasE(self): return 'E' in self
+	def hasE(self): return self.E is not None
 	@property
-	def hasIsE(self): return 'is_end' in self
+	def hasIsE(self): return self.is_end
 	@property
 	def sym(self):
-		if self.hasT : return next(iter(self.T))
-		if self.hasIsE : return '!'
+		if self.T is not None : return next(iter(self.T))
+		if self.is_end : return '!'
 		return '?'
 
 	#given states setup the transition 
 	def add_epsilon_trans(self, sto): 
-		if not self.hasE : self['E'] = []
+		if self.E is None : self.E = []
 		self.E.append(sto)
 	def add_symbol_trans(self, sto, symbol): 
-		if not self.hasT : self['T'] = Symbol({})
+		if self.T is None : self.T = Symbol()
 		self.T[symbol] = sto
-	def ise_false(self):
-		if self.hasIsE : del self['is_end'] 
-	def ise_true(self):
-		self['is_end'] = True
+	def ise_false(self): self.is_end = False
+	def ise_true(self): self.is_end = True
+
+	def __repr__(self): return f'State({self.id}:{self.sym})'
 
 
 # start-State => end-State
-class NFA(AttrDict) :
+# frozen NFAs belong to a compiled Pattern and are copied, not mutated, by OPS
+class NFA(object) :
+	__slots__ = ('start', 'end', 'frozen')
+
+	def __init__(self, start, end):
+		self.start = start
+		self.end = end
+		self.frozen = False
 
 	@classmethod
-	def new(cls, start, end):
-		return NFA({'start':start, 'end':end})
+	def new(cls, start, end): return cls(start, end)
 
 	@classmethod
 	def epsilon(cls):
@@ -73,10 +100,324 @@ class NFA(AttrDict) :
 		start.add_symbol_trans(end, symbol)
 		return NFA.new(start, end)
 
+	#all states reachable from start, breadth first
+	def states(self):
+		seen, queue = { self.start }, deque([self.start])
+		while queue :
+			state = queue.popleft()
+			yield state
+			nxt = list(state.T.values()) if state.hasT else []
+			if state.hasE : nxt.extend(state.E)
+			for st in nxt :
+				if st not in seen :
+					seen.add(st)
+					queue.append(st)
+
+	#deep copy of the graph, the copy is not frozen
+	def copy(self):
+		cp = { st : State.new(st.is_end) for st in self.states() }
+		for st, new in cp.items() :
+			new.C = st.C
+			if st.hasT :
+				for sym, sto in st.T.items() : new.add_symbol_trans(cp[sto], sym)
+			if st.hasE :
+				for sto in st.E : new.add_epsilon_trans(cp[sto])
+		return NFA.new(cp[self.start], cp[self.end])
+
+	#renumber states 0..n-1 and mark as shared
+	def freeze(self):
+		states = list(self.states())
+		for i, st in enumerate(states) : st.id = i
+		self.frozen = True
+		return states
+
+	def __repr__(self): return f'NFA({self.start!r} => {self.end!r})'
+
+
+# Compiled regex : immutable, so it can be cached and shared between match calls
+#  State-sets are frozensets of state ids. Epsilon closures are computed once, per state :
+#    closures[id] : ids of the non-epsilon states reachable from the state (same as Regex.add_next_state)
+#    moves[id] : (symbols or None for ANY, closure of the target) of a symbol-state, else None
+#  With counted repetitions (counted=True) a state inside {n,m} is in the set as (state id, counts..)
+#    one count per enclosing repetition, outermost first, the states outside them stay plain ids.
+#    closures/moves are then filled on first use per such id (Lazy)
+#  Literal analysis, for skipping wide early steps and pushing filters down to the stores :
+#    literal_prefix : symbols every match starts with, literal_ids : state ids after them
+#    first : symbols a match can start with, None if ANY or the empty sequence match
+#    required : literal runs every match contains (from the postfix)
+#  fixed : Fixed matcher of literal/mask/class patterns (see fastpath.py), else None
+class Pattern(object) :
+	__slots__ = ('key', 'is_str', 'postfix', 'nfa', 'states', 'counted', 'closures', 'moves', 'initial', 'end_ids',
+		'literal_prefix', 'literal_ids', 'first', 'required', 'fixed', '_dfa')
+
+	def __init__(self, key, postfix, nfa, is_str=None):
+		setattr_ = super().__setattr__
+		setattr_('key', key)
+		setattr_('is_str', isi(key, str) if is_str is None else is_str)
+		setattr_('postfix', tuple(postfix) if postfix is not None else None)
+		setattr_('nfa', nfa)
+		setattr_('states', tuple(nfa.freeze()))
+		setattr_('counted', any( st.C is not None for st in self.states ))
+		if self.counted :
+			setattr_('closures', Lazy(lambda i : self.count_closure(*self.split(i))))
+			setattr_('moves', Lazy(self.move))
+		else :
+			setattr_('closures', tuple( self.closure(st) for st in self.states ))
+			setattr_('moves', tuple( self.move(st.id) for st in self.states ))
+		setattr_('initial', frozenset(self.closures[nfa.start.id]))
+		setattr_('end_ids', frozenset( st.id for st in self.states if st.is_end and not st.hasE ))
+		literal, ids = self.literal()
+		as_seq = ''.join if self.is_str else tuple
+		setattr_('literal_prefix', as_seq(literal))
+		setattr_('literal_ids', ids)
+		setattr_('first', self.next_syms(self.initial))
+		setattr_('required', tuple( as_seq(l) for l in required_literals(postfix or ()) ))
+		positions = fixed_positions(postfix)
+		setattr_('fixed', None if positions is None else Fixed(positions, self.is_str))
+		setattr_('_dfa', None)
+
+	#iterative, so deep nestings don't hit the recursion limit
+	def closure(self, state):
+		res, stack, visited = [], [state], { state }
+		while stack :
+			st = stack.pop()
+			if st.hasE :
+				for s in reversed(st.E) :
+					if s not in visited :
+						visited.add(s)
+						stack.append(s)
+			else : res.append(st.id)
+		return tuple(res)
+
+	#(state, counts) of a state-set id
+	def split(self, i): return (self.states[i], ()) if isi(i, int) else (self.states[i[0]], i[1:])
+
+	#(symbols or None for ANY, closure of the target) of a symbol-state id, else None
+	def move(self, i):
+		st, counts = self.split(i)
+		if not st.hasT : return None
+		return ( None if st.sym == ANY else frozenset(st.T), self.closures[self.cid(st.T[st.sym], counts)] )
+
+	def cid(self, st, counts): return st.id if len(counts) == 0 else (st.id,) + counts
+
+	#closure() through the counter states : push starts a count for the body,
+	#  loop counts a finished iteration, back to the body while below m, out of it (count dropped) from n on
+	#  without m the count stops at n, so the ids stay finite
+	def count_closure(self, state, counts):
+		res, stack, visited = [], [(state, counts)], { (state, counts) }
+		while stack :
+			st, cnt = stack.pop()
+			if not st.hasE :
+				res.append(self.cid(st, cnt))
+				continue
+			if st.C is None : nxt = [ (s, cnt) for s in st.E ]
+			elif st.C[0] == 'push' : nxt = [ (st.E[0], cnt + (0,)) ]
+			else :
+				_, n, m = st.C
+				k, nxt = cnt[-1] + 1, []
+				if m is None or k < m : nxt.append((st.E[0], cnt[:-1] + (k if m is not None else min(k, n),)))
+				if k >= n : nxt.append((st.E[1], cnt[:-1]))
+			for s in reversed(nxt) :
+				if s not in visited :
+					visited.add(s)
+					stack.append(s)
+		return tuple(res)
+
+	#state ids after consuming symbol
+	def step(self, ids, symbol):
+		res = set()
+		moves = self.moves
+		for i in ids :
+			move = moves[i]
+			if move is None : continue
+			syms, to = move
+			if syms is None or symbol in syms : res.update(to)
+		return frozenset(res)
+
+	#is there any end-state
+	def is_end(self, ids): return not self.end_ids.isdisjoint(ids)
+
+	#symbols accepted after the state ids, None if ANY is accepted or ids can end here
+	def next_syms(self, ids):
+		if self.is_end(ids) : return None
+		syms = set()
+		for i in ids :
+			move = self.moves[i]
+			if move is None : continue
+			if move[0] is None : return None
+			syms |= move[0]
+		return frozenset(syms)
+
+	#symbols acceptable after ids, the end marker included if ids accept, None if any symbol is
+	def allowed(self, ids, end):
+		syms = set()
+		for i in ids :
+			move = self.moves[i]
+			if move is None : continue
+			if move[0] is None : return None
+			syms |= move[0]
+		if self.is_end(ids) : syms.add(end)
+		return frozenset(syms)
+
+	#mandatory literal prefix : follow the states while a single symbol is possible
+	def literal(self):
+		literal, ids = [], self.initial
+		for _ in range(len(self.states)) :
+			syms = self.next_syms(ids)
+			if syms is None or len(syms) != 1 : break
+			sym = next(iter(syms))
+			literal.append(sym)
+			ids = self.step(ids, sym)
+		return literal, ids
+
+	#pickled as a flat state table (id => is_end, symbol transitions, epsilon transitions),
+	#  so the automaton can be shipped to worker processes without deep recursion
+	def __reduce__(self):
+		table = [ ( st.is_end, [ (s, to.id) for s, to in st.T.items() ] if st.hasT else None,
+			[ to.id for to in st.E ] if st.hasE else None, st.C ) for st in self.states ]
+		return (restore_pattern, (self.key, self.postfix, table, self.nfa.end.id, self.is_str))
+
+	#literal symbols used by the transitions, ANY not included
+	@property
+	def symbols(self):
+		return frozenset( s for st in self.states if st.hasT and st.sym != ANY for s in st.T )
+
+	def __setattr__(self, name, value): raise AttributeError('Pattern is immutable')
+
+	@property
+	def start(self): return self.nfa.start
+
+	#lazily built DFA, created on first use and shared by all users of the pattern
+	def dfa(self):
+		if self._dfa is None : super().__setattr__('_dfa', LazyDFA(self))
+		return self._dfa
+
+	def __repr__(self): return f'Pattern({self.key!r}, states={len(self.states)})'
+
+
+def restore_pattern(key, postfix, table, end, is_str=None):
+	states = [ State.new(is_end) for is_end, _, _, _ in table ]
+	for st, (_, T, E, C) in zip(states, table) :
+		st.C = C
+		if T is not None :
+			for sym, to in T : st.add_symbol_trans(states[to], sym)
+		if E is not None :
+			for to in E : st.add_epsilon_trans(states[to])
+	return Pattern(key, postfix, NFA.new(states[0], states[end]), is_str=is_str)
+
+
+# dict filled on first access : key => fun(key)
+class Lazy(dict):
+
+	def __init__(self, fun):
+		super().__init__()
+		self.fun = fun
+
+	def __missing__(self, key):
+		value = self[key] = self.fun(key)
+		return value
+
+
+# Many compiled patterns in one automaton : a new start state with epsilon transitions to a copy
+#  of every pattern's NFA. A step over it advances all the patterns at once, so the prefixes they
+#  share are looked up once
+#    owner[id] : index of the pattern the state belongs to (None for the common start)
+#    tags[id]  : index of the pattern an end state accepts, else None
+class MultiPattern(Pattern) :
+	__slots__ = ('patterns', 'owner', 'tags')
+
+	def __init__(self, patterns):
+		patterns = tuple(patterns)
+		if len(patterns) == 0 : raise ValueError('MultiPattern needs at least one pattern')
+		copies = [ p.nfa.copy() for p in patterns ]
+		start = State.new(False)
+		for cp in copies : start.add_epsilon_trans(cp.start)
+		members = [ list(cp.states()) for cp in copies ]
+		Pattern.__init__(self, tuple( p.key for p in patterns ), None, NFA.new(start, copies[0].end), is_str=patterns[0].is_str)
+		owner, tags = [None] * len(self.states), [None] * len(self.states)
+		for k, states in enumerate(members) :
+			for st in states :
+				owner[st.id] = k
+				if st.id in self.end_ids : tags[st.id] = k
+		setattr_ = super(Pattern, self).__setattr__
+		setattr_('patterns', patterns)
+		setattr_('owner', tuple(owner))
+		setattr_('tags', tuple(tags))
+
+	#indexes of the patterns accepting at ids (end states are never inside a counted repetition)
+	def ends(self, ids):
+		return { self.tags[i] for i in ids if isi(i, int) and self.tags[i] is not None }
+
+	#ids without the states of the patterns in done
+	def without(self, ids, done):
+		return frozenset( i for i in ids if self.owner[i if isi(i, int) else i[0]] not in done )
+
+	def __reduce__(self): return (MultiPattern, (self.patterns,))
+
+	def __repr__(self): return f'MultiPattern({len(self.patterns)} patterns, states={len(self.states)})'
+
+
+# DFA built on demand by subset construction over the Pattern NFA
+#  DFA states are memoized frozensets of NFA state ids, transitions are cached per (dfa-state, symbol)
+#  Symbols can be any hashable item : characters, numbers, words ...
+#  The transition cache is flushed when it grows over max_trans, if the number of DFA states
+#  grows over max_states the DFA gives up (blown) and callers fall back to NFA simulation
+class LazyDFA(object):
+
+	def __init__(self, pattern, max_states=10000, max_trans=100000):
+		self.pattern = pattern
+		self.max_states, self.max_trans = max_states, max_trans
+		self.ids = {} # frozenset of NFA ids => DFA state
+		self.sets = [] # DFA state => frozenset of NFA ids
+		self.accept = [] # DFA state => is end-state
+		self.trans = {} # (DFA state, symbol) => DFA state
+		self.blown = False
+		self.flushes = 0
+		self.start = self.add(pattern.initial)
+		self.dead = self.add(frozenset())
+
+	def add(self, ids):
+		d = self.ids.get(ids)
+		if d is None :
+			if len(self.sets) >= self.max_states :
+				self.blown = True
+				return None
+			d = self.ids[ids] = len(self.sets)
+			self.sets.append(ids)
+			self.accept.append(self.pattern.is_end(ids))
+		return d
+
+	#DFA state after consuming symbol, None if the DFA blew up
+	def next(self, d, symbol):
+		key = (d, symbol)
+		nd = self.trans.get(key)
+		if nd is None :
+			nd = self.add(self.pattern.step(self.sets[d], symbol))
+			if nd is None : return None
+			if len(self.trans) >= self.max_trans :
+				self.trans.clear()
+				self.flushes += 1
+			self.trans[key] = nd
+		return nd
+
+	#True/False, or None when the DFA blew up and the caller has to simulate the NFA
+	def match(self, seq):
+		if self.blown : return None
+		d, dead = self.start, self.dead
+		for symbol in seq :
+			d = self.next(d, symbol)
+			if d is None : return None
+			if d == dead : return False
+		return self.accept[d]
+
 
 class OPS(object):
 
+	#frozen (compiled, possibly cached) fragments are copied before being wired in
+	def own(self, nfa): return nfa.copy() if nfa.frozen else nfa
+
 	def zero_one(self, state): #?
+		state = self.own(state)
 		start = State.new(False)
 		end = State.new(True)
 
@@ -89,16 +430,19 @@ class OPS(object):
 
 	# state ==>   state . state*
 	def oneORmore(self, state): #+
+		state = self.own(state)
 		once = state #Transition(state)
 		once.end.ise_false()
 		return self.concat(once, self.closure(state))
 
 	def concat(self, first, second):
+		first, second = self.own(first), self.own(second)
 		first.end.add_epsilon_trans(second.start)
 		first.end.ise_false()
 		return NFA.new(first.start, second.end)
 
 	def union(self, first, second): #|
+		first, second = self.own(first), self.own(second)
 		start = State.new(False)
 		start.add_epsilon_trans(first.start)
 		start.add_epsilon_trans(second.start)
@@ -111,6 +455,7 @@ class OPS(object):
 		return NFA.new(start, end)
 
 	def closure(self, nfa): #*
+		nfa = self.own(nfa)
 		start = State.new(False)
 		end = State.new(True)
 
@@ -137,40 +482,52 @@ class OPS(object):
 
 		return NFA.new(start, end)
 
-	#Implemented as unions i.e. a{2,4} : aa|aaa|aaaa
-	#nfa: n-normal states + (m-n)-end states
-	def n2m(self, symbol, nm): #{n,m}
-		#extract from, to
-		n,m = [ int(i) for i in nm.replace('{','').replace('}','').split(',') ]
-		# say(f"n2m> {symbol}, {nm}: {n},{m}")
-		
-		#create the start State
-		start = State.new(True if n == 0 else False)
-		prev = start
-		# {1,3} .. start->a->a:end->a:end->a:end
-		for i in range(m) :
-			is_end = False if i+1 < n else True
-			state = State.new(is_end)
-			prev.add_symbol_trans(state, symbol.start.sym)
-			prev = state
-
-		end = state
-		# pprint(start, width=40)
+	#{n,m}, {n} or {n,} : n, m (None for no upper bound)
+	def counts(self, nm):
+		nm = nm.replace('{','').replace('}','').split(',')
+		n = int(nm[0] or 0)
+		m = n if len(nm) == 1 else int(nm[1]) if nm[1] != '' else None
+		if m is not None and m < n : raise ValueError(f'bad repetition {{{n},{m}}}')
+		return n, m
+
+	#Counted repetition of any sub-expression with one copy of it and a counter, instead of m copies
+	#  start ->(n == 0)-> end
+	#  start -> push ->(count 0)-> body -> loop ->(count+1 < m)-> body
+	#                                           ->(count+1 >= n)-> end
+	#  the counts are kept per state-set id, see Pattern.count_closure()
+	def n2m(self, nfa, nm): #{n,m}
+		n, m = self.counts(nm)
+		if m == 0 : return NFA.epsilon()
+		body = self.own(nfa)
+		start, push, loop, end = State.new(False), State.new(False), State.new(False), State.new(True)
+		if n == 0 : start.add_epsilon_trans(end)
+		start.add_epsilon_trans(push)
+		push.C = ('push',)
+		push.add_epsilon_trans(body.start)
+		body.end.add_epsilon_trans(loop)
+		body.end.ise_false()
+		loop.C = ('loop', n, m)
+		loop.add_epsilon_trans(body.start)
+		loop.add_epsilon_trans(end)
 		return NFA.new(start, end)
 
 
 class Regex(object):
 
-	def to_nfa(self, postfix_exp):
-
-		ops = OPS()
+	cache = LRU(maxsize=512) #compiled patterns, shared by all Regex instances
 
+	def to_nfa(self, postfix_exp):
 		if isi(postfix_exp, (str,list)) : 
 			i2p = I2P()
 			postfix_exp = i2p.to_postfix(postfix_exp)
 			##log('nfa', f'postfix> {postfix_exp}')
+		return self.postfix2nfa(postfix_exp)
 
-		if postfix_exp == [] : return NFA.epsilon()
+	def postfix2nfa(self, postfix_exp):
+
+		ops = OPS()
+
+		if len(postfix_exp) == 0 : return NFA.epsilon()
 
 		stack = []
 		
@@ -199,113 +556,245 @@ class Regex(object):
 		return stack.pop()
 
 
+	#add the non-epsilon states reachable from state, iterative walk over the epsilon transitions
+	#  (compiled patterns keep these precomputed, see Pattern.closures)
 	def add_next_state(self, state, next_states, visited=None) :
 		if visited is None : visited = set()
-
-		if state.hasE :
-			for st in state.E :
-				##log('an',f' eps:{st.sym}')
-				if st not in visited :
-					visited.add(st);
-					self.add_next_state(st, next_states, visited);
-		else :
-			#log('an',f'add state> {state.sym}')
-			if isi(next_states, set) : next_states.add(state)
-			else : next_states.append(state)
+		add = next_states.add if isi(next_states, set) else next_states.append
+		stack = [state]
+		while stack :
+			state = stack.pop()
+			if state.hasE :
+				for st in reversed(state.E) :
+					##log('an',f' eps:{st.sym}')
+					if st not in visited :
+						visited.add(st)
+						stack.append(st)
+			else :
+				#log('an',f'add state> {state.sym}')
+				add(state)
 
 	#shortcut representation : is it ['(,1,|,2,)'] in place of ['(',1,'|',2,')']
 	def is_lst_str(self, item) :
 		return isi(item, list) and len(item) == 1 and isi(item[0], str) #and len(item[0]) > 1 
 
-
-	def match_one(self, regex, seq) :
-		#convert ['1,|,2'] to ['1','|','2']
-		if self.is_lst_str(regex) : 
-			regex = [ (int(i) if i.isdigit() else i) for i in regex[0].split(',') ]	
-		if self.is_lst_str(seq) :
-			seq = [ (int(i) if i.isdigit() else i) for i in seq[0].split(',')	]	
-
-		if isi(regex, (str,list)) : regex = self.to_nfa(regex)
-		# pprint(regex, width=40)
-		current_states = []
-		self.add_next_state(regex.start, current_states)
-
+	#convert ['1,|,2'] to [1,'|',2]
+	def lst_str2lst(self, item) :
+		return [ (int(i) if i.isdigit() else i) for i in item[0].split(',') ]
+
+	#cache key : str stays str, lists (incl. the shortcut) become tuples
+	def normalize(self, regex) :
+		if self.is_lst_str(regex) : regex = self.lst_str2lst(regex)
+		return regex if isi(regex, str) else tuple(regex)
+
+	#returns cached immutable compiled Pattern, building it on a miss
+	def compile(self, regex) :
+		if isi(regex, Pattern) : return regex
+		if isi(regex, NFA) : return Pattern(None, None, regex) #prebuilt automaton, not cached
+
+		key = self.normalize(regex)
+		pattern = self.cache.get(key)
+		if pattern is None :
+			postfix = I2P().to_postfix(key if isi(key, str) else list(key))
+			pattern = Pattern(key, postfix, self.postfix2nfa(postfix))
+			self.cache.put(key, pattern)
+		return pattern
+
+	#postfix of the reversed regex : the operands of every concatenation swap places
+	def reverse_postfix(self, postfix) :
+		stack = []
+		for token in postfix :
+			op = token if isi(token, str) else None
+			if op in ('*', '?', '+') or (op is not None and op.startswith('{')) : stack.append(stack.pop() + [token])
+			elif op in ('|', CAT) :
+				right, left = stack.pop(), stack.pop()
+				stack.append(right + left + [token] if op == CAT else left + right + [token])
+			else : stack.append([token])
+		assert len(stack) == 1, "Should be only one element left in the stack, but have {}".format(len(stack))
+		return stack[0]
+
+	#cached Pattern matching the reversed sequences, None for patterns built from an NFA
+	#  a MultiPattern of the reversed patterns for a MultiPattern
+	def compile_reversed(self, regex) :
+		if isi(regex, MultiPattern) :
+			revs = [ self.compile_reversed(p) for p in regex.patterns ]
+			return None if any( r is None for r in revs ) else self.compile_multi(revs)
+		pattern = self.compile(regex)
+		if pattern.postfix is None : return None
+		key = ('rev', pattern.key)
+		rev = self.cache.get(key)
+		if rev is None :
+			postfix = self.reverse_postfix(pattern.postfix) if len(pattern.postfix) > 0 else []
+			rev = Pattern(key, postfix, self.postfix2nfa(postfix), is_str=pattern.is_str)
+			self.cache.put(key, rev)
+		return rev
+
+	#is matching right-to-left more selective : longer mandatory literal at the end than at the
+	#  start or, with none on both sides, fewer possible last symbols than first ones
+	def backward(self, pattern, rev) :
+		def score(p) : return (len(p.literal_prefix), -len(p.first) if p.first is not None else float('-inf'))
+		return score(rev) > score(pattern)
+
+	#cached MultiPattern of the patterns, in the same cache as compile()
+	def compile_multi(self, patterns) :
+		if isi(patterns, MultiPattern) : return patterns
+		patterns = [ self.compile(p) for p in patterns ]
+		if any( p.key is None for p in patterns ) : return MultiPattern(patterns)
+		key = ('multi',) + tuple( p.key for p in patterns )
+		pattern = self.cache.get(key)
+		if pattern is None :
+			pattern = MultiPattern(patterns)
+			self.cache.put(key, pattern)
+		return pattern
+
+
+	#dfa=True : use the Pattern lazy DFA, falls back to NFA simulation if the DFA blew up
+	#fast : literal/mask/class patterns are checked position by position, see fastpath.py
+	def match_one(self, regex, seq, dfa=False, fast=True) :
+		if self.is_lst_str(seq) : seq = self.lst_str2lst(seq)
+
+		pattern = self.compile(regex)
+		if fast and pattern.fixed is not None : return pattern.fixed.match_one(seq)
+		if dfa :
+			res = pattern.dfa().match(seq)
+			if res is not None : return res
+
+		current = pattern.initial
 		for symbol in seq :
-			next_states = []
-			for state in current_states :
-				#log('mo','ssym:',state.sym,' sym:', symbol)
-				# not symbol AND not any-symbol match : pass
-				if not state.hasT or (symbol not in state.T and state.sym != ANY ) : continue
+			#log('mo','ids:',current,' sym:', symbol)
+			current = pattern.step(current, symbol)
+			if len(current) == 0 : return False
 
-				next_state = state.T[state.sym] # access by state.sym instead of symbol
-				if next_state : self.add_next_state(next_state, next_states)
+		#is there any end-state 
+		return pattern.is_end(current)
 
-			current_states = next_states
 
-		#is there any end-state 
-		return any([ s.hasIsE for s in current_states ])
+	#Which of the in-memory sequences match : sequences are encoded into a NumPy matrix
+	#  (or pass a prebuilt Corpus to reuse the encoding across patterns) and the pattern DFA
+	#  is advanced one column at a time over all of them
+	#  returns boolean mask or with indices=True the indices of the matching sequences
+	#  fast : literal/mask/class patterns are checked column by column, without the DFA
+	def match_many(self, regex, sequences, indices=False, fast=True) :
+		pattern = self.compile(regex)
+		corpus = sequences if isi(sequences, Corpus) else Corpus(sequences)
+		#if the DFA blew up, simulate the NFA per sequence
+		mask = vector_match_many(pattern, corpus, fallback=partial(self.match_one, pattern, fast=fast), fast=fast)
+		return mask.nonzero()[0] if indices else mask
 
 
 	#=====================================================================================
 
-	#Based on current states and prefixes get the predicted next prefixes+sym
-	#  use the fun() to get the prediction
-	def next_seq_syms(self, states, prefixes, fun=None, head=None, end='.'):
-		#log('ns',f'next_syms -----------------------------------------{len(states)}')
-		syms = []
+	#limit is a shortcut for the Cap(limit) policy, the policy is started for a new match
+	def frontier_policy(self, limit=None, policy=None, batched=False):
+		if policy is None : policy = Policy() if limit is None else Cap(limit)
+		policy.start(batched)
+		return policy
+
+	#Initial frontier : (head, {'' or () : state ids}, transitions cache)
+	#  with auto_head the mandatory literal prefix of the pattern (e.g. 'wh' of 'wh.r..') is
+	#  appended to the head, so the store looks it up in one step instead of one step per symbol
+	def start_frontier(self, pattern, head=None, auto_head=True):
+		#list sequences are carried as tuples internally, returned as lists
+		if head is not None and not pattern.is_str : head = tuple(head)
+		start = pattern.initial
+		if auto_head and len(pattern.literal_prefix) > 0 :
+			head = pattern.literal_prefix if head is None else head + pattern.literal_prefix
+			start = pattern.literal_ids
+		return head, { ('' if pattern.is_str else ()) : start }, { start : start }
+
+	#does the store function declare the keyword argument name
+	def takes(self, fun, name):
+		if fun is None : return False
+		try : return name in signature(fun).parameters
+		except (TypeError, ValueError) : return False
+
+	#keyword arguments pushed down to a store function that declares them :
+	#  required : literal runs every matching sequence contains (Pattern.required)
+	def store_hints(self, pattern, fun):
+		if len(pattern.required) == 0 or not self.takes(fun, 'required') : return {}
+		return { 'required': pattern.required }
+
+	#Symbol filter per prefix, pushed down to stores that declare allowed :
+	#  frozenset of the acceptable next symbols (with the end marker when the prefix may end)
+	#  or None when any symbol is, filters caches it per interned state-set
+	def allowed_syms(self, pattern, frontier, prefixes, end, filters):
+		res = []
 		for prefix in prefixes :
-			#log('ns', f'  search:{prefix}')
-			pred = fun(prefix=prefix, end=end) # search for match
-			if len(pred) > 0 : syms.append(pred) #skip empty results
-		return syms
-
-	#move forward in to the next states in the regex
-	def next_re_states(self, current_states) :
-		#log('ns','next_states -----------------------------------------')
-		next_states = set()
-		for state in current_states :
-			if not state.hasT or (state.sym not in state.T and state.sym != ANY ) : continue
-			next_state = state.T[state.sym]
-			if next_state : self.add_next_state(next_state, next_states)
-		return list(next_states)
-
-	#given states and symbols, return only the ones that match-by-suffix 
-	def filter_sas(self, states, symsOseqs):
+			ids = frontier[prefix]
+			if ids not in filters : filters[ids] = pattern.allowed(ids, end)
+			res.append(filters[ids])
+		return res
+
+	#trace argument of match() : a Trace, True for a new one or a callback(step) for a new one,
+	#  None/False (any falsy value) is no tracing
+	def tracer(self, trace):
+		if isi(trace, Trace) : return trace
+		if not trace : return None
+		return Trace() if trace is True else Trace(callback=trace)
+
+	#Based on the prefixes get the predicted next prefixes+sym, one list per prefix
+	#  use the fun() or the batched batch_fun(prefixes, head, end) to get the prediction
+	#  allowed : symbol filters aligned with prefixes, passed only to stores that take it
+	def next_seq_syms(self, prefixes, fun=None, batch_fun=None, head=None, end='.', allowed=None, **hints):
+		#log('ns',f'next_syms -----------------------------------------{len(prefixes)}')
+		if len(prefixes) == 0 : return []
+		if allowed is not None :
+			if batch_fun is not None : return batch_fun(prefixes=prefixes, head=head, end=end, allowed=allowed, **hints)
+			return [ fun(prefix=prefix, head=head, end=end, allowed=a, **hints) for prefix, a in zip(prefixes, allowed) ]
+		if batch_fun is not None : return batch_fun(prefixes=prefixes, head=head, end=end, **hints)
+		return [ fun(prefix=prefix, head=head, end=end, **hints) for prefix in prefixes ]
+
+	#move forward in to the next states in the regex, union of the precomputed closures
+	def next_re_states(self, pattern, ids, symbol) : return pattern.step(ids, symbol)
+
+	#given every prefix with its own states and predicted seqs, keep the seqs whose suffix
+	#  is accepted by the states of their prefix
+	#  trans caches (states, sym) => next states, state-sets are interned so the
+	#  frontier shares one frozenset per distinct set of NFA states
+	#  returns the full sequences i.e. prefix matched and ends + next frontier : {seq : states}
+	def filter_sas(self, pattern, frontier, prefixes, preds, end, trans):
 		#log('fs', 'filter -----------------------------------------')
-		#if flag true then the syms are lists instead of strings
-		is_list_sym = len(symsOseqs) > 0 and isi(symsOseqs[0][0], list)
-		#we need to remove duplicates so we use sets instead of lists
-		filtered_states = set()
-		filtered_syms = set() # prefixes
-		for syms in symsOseqs :
-			for seq in syms :
+		full_seqs, nxt = [], {}
+		for prefix, seqs in zip(prefixes, preds) :
+			states = frontier[prefix]
+			for seq in seqs :
+				if isi(seq, list) : seq = tuple(seq)
 				suffix = seq[-1]
-				for state in states :
-					#log('fs', f'   state:{state.sym} == suffix:{suffix} ? seq:{seq} : {state.sym == ANY or state.sym == suffix}')
-					if state.sym == ANY or state.sym == suffix : #if there is a match 
-						filtered_states.add(state)
-						# if not flag and isi(seq, list) : flag = True 
-						filtered_syms.add(str(seq)) #needed if arg is list to make it hashable for the set
-
-		#convert str-lists back to lists
-		if is_list_sym : filtered_syms = [eval(s) for s in filtered_syms ]
-		return list(filtered_states), list(filtered_syms)
-
-	#check conditions for ending matching
-	def is_end(self, states, seqs, end):
-		is_end = any([ s.hasIsE for s in states ]) #did we reach END node
-		#filter sequences w/o end-sym
-		full_seqs = [s for ss in seqs for s in ss if s[-1] == end  ]
-		#log('m','  IsE: ', is_end)
-		if is_end :
-			#end=True and there are full seq
-			if len(full_seqs) > 0 : return True, full_seqs
-			#end but no full sequences
-			else : return False, full_seqs
-		else :
-			#end=False but no seqs 
-			if len(seqs) == 0 : return True, full_seqs
-			else : return False, full_seqs	
+				if suffix == end :
+					if pattern.is_end(states) : full_seqs.append(seq)
+					continue
+				key = (states, suffix)
+				next_states = trans.get(key)
+				if next_states is None :
+					next_states = self.next_re_states(pattern, states, suffix)
+					next_states = trans[key] = trans.setdefault(next_states, next_states)
+				#log('fs', f'   {seq} : {next_states}')
+				if len(next_states) > 0 : nxt[seq] = next_states
+		return full_seqs, nxt
+
+
+	# Search of one match call, with the options shared by match(), iter_match(), match_multi() and amatch() :
+	#  compiles the regex (a MultiPattern of the patterns with multi), picks the direction and starts the policy
+	#  policy : frontier policy (see frontier.py) instead of limit, the other options see match()
+	def search(self, regex, fun=None, batch_fun=None, head=None, limit=None, end='.', policy=None, auto_head=True, trace=None,
+			match_suffix_fun=None, match_suffixes_fun=None, direction='auto', max_frontier_bytes=None, chunk=10000, spill_dir=None,
+			multi=False, is_async=False):
+
+		trace = self.tracer(trace)
+		if trace is not None : t0 = time.perf_counter()
+		pattern = self.compile_multi(regex) if multi else self.compile(regex)
+		backward = False
+		if direction != 'forward' and head is None and (match_suffix_fun or match_suffixes_fun) is not None :
+			rev = self.compile_reversed(pattern)
+			if rev is not None and (direction == 'backward' or (fun or batch_fun) is None or self.backward(pattern, rev)) :
+				pattern, fun, batch_fun, backward = rev, match_suffix_fun, match_suffixes_fun, True
+		if direction == 'backward' and not backward : raise ValueError('direction=backward needs match_suffix_fun/match_suffixes_fun and no head')
+		if max_frontier_bytes is not None and (limit is not None or policy is not None) :
+			raise ValueError('limit/policy can not be combined with max_frontier_bytes, a spilled frontier is never selected as a whole')
+		if trace is not None : trace.compile_time += time.perf_counter() - t0
+		policy = self.frontier_policy(limit, policy, batched=batch_fun is not None)
+		return Search(self, pattern, fun, batch_fun, head, end, policy, trace, auto_head, backward,
+			max_frontier_bytes, chunk, spill_dir, is_async)
 
 
 	# This method matches regex against opaque sequence-store
@@ -313,46 +802,265 @@ class Regex(object):
 	#  in any number of storage : lists, SQL or Graph DB
 	# The only requierment is to provide a function which given a sub-sequence i.e. prefix 
 	# returns the next element i.e. character, number, word ... 
-
-	def match(self, regex, match_prefix_fun, head=None, limit=None, max_steps=10, end='.'):
-
-		prefixes = [''] if isi(regex,str) else [[]]
-
-		if self.is_lst_str(regex) : #convert ['1,|,3'] to ['1','|','3']
-			regex = [ (int(i) if i.isdigit() else i) for i in regex[0].split(',')	]	
-		#converl list to NFA struct
-		if isi(regex, (str, list)) : regex = self.to_nfa(regex)
-
-		filtered = set()
-		self.add_next_state(regex.start, filtered)
-		states = filtered
-
-		i = 0
-		while i <= max_steps :
-			#log('m','\n===================================================')
-
-			#log('m',' fstates  :', [f.sym for f in filtered])
-			#log('m',' prefixes :', [f for f in prefixes])
-
-			if i > 0 : head = None #only needed on the first run
-			syms = self.next_seq_syms(filtered, prefixes, fun=partial(match_prefix_fun, head=head), end=end)
-			#log('m',' syms : ', syms)
-			
-			if i > 0 : states = self.next_re_states(filtered)
-			#log('m',' states :', [ s.sym for s in states])
-
-			#check if reach the end of the regex
-			flag, full_seqs = self.is_end(states, syms, end) 
-			if flag : return full_seqs
-
-			filtered, prefixes = self.filter_sas(states, syms)
-			
-			if limit is not None : #limiting per step results
-				#log('m','\n before-limit :', [f for f in prefixes])
-				prefixes = prefixes[:limit]
-				#log('m',' limit-pre :', [f for f in prefixes])
-
-			i += 1
+	# Optionally match_prefixes_fun(prefixes, head, end) does the same for all the prefixes
+	#  of a step in one store round-trip, it is used instead of match_prefix_fun when given
+	# Every prefix keeps its own set of NFA states, so it is expanded only through them (see Search)
+	# limit : expand at most limit prefixes per step (in sorted order)
+	# opts, the same for iter_match(), match_multi() and amatch() :
+	#  policy : frontier policy (see frontier.py) for beam search by store score or a global budget of store calls/prefixes
+	#  auto_head : look up the literal prefix of the pattern in one step, see start_frontier()
+	#  Store functions that take an allowed argument get the acceptable next symbols of every prefix
+	#   (see allowed_syms()) and may return only those continuations, the others work unchanged
+	#  trace : record per-step stats (see tracing.py). With tracing on (a Trace, True or a callback)
+	#   match() returns (results, trace) instead of results, with None/False it returns results only.
+	#   A Trace passed in is filled in place, so it can also be read after the call
+	#  match_suffix_fun/match_suffixes_fun : the same lookups over the reversed sequences (e.g. SuffixStore),
+	#   then the pattern can be matched right-to-left with its reversed automaton, which is much faster
+	#   for patterns like '.+ing' or '..r.s'. direction : 'auto' picks the side with the more selective
+	#   literals (see backward()), 'forward' or 'backward' force it. head always matches forward
+	#  max_frontier_bytes : memory ceiling of the frontier for very broad patterns, entries over it go to
+	#   temp files in spill_dir and a step is looked up and filtered chunk prefixes at a time (see spill.py),
+	#   it can not be combined with limit/policy
+
+	def match(self, regex, match_prefix_fun=None, head=None, limit=None, max_steps=10, end='.', match_prefixes_fun=None, **opts):
+
+		search = self.search(regex, match_prefix_fun, match_prefixes_fun, head, limit, end, **opts)
+		res = None
+		with closing(search.steps(max_steps)) as steps :
+			for part in steps :
+				#reached the end of the regex or nothing more to match
+				res = search.collect(part)
+				if res is not None : break
+		return search.returns(res)
+
+
+	# Generator version of match() : yields every full sequence (ending with the end marker) as soon as
+	#  the lookup of its prefix finds it, and keeps going over the next steps instead of stopping at the
+	#  first step with results. Prefixes are looked up one at a time (or one batch per step), so
+	#  stopping the iteration e.g. islice(iter_match(...), 10) stops the store lookups too.
+	#  Only the current and the next frontier are kept, limit/opts as in match()
+	#  trace : a Trace (or callback) filled as the steps complete
+	def iter_match(self, regex, match_prefix_fun=None, head=None, limit=None, max_steps=10, end='.', match_prefixes_fun=None, **opts):
+
+		search = self.search(regex, match_prefix_fun, match_prefixes_fun, head, limit, end, **opts)
+		with closing(search.steps(max_steps, stream=True)) as steps :
+			for part in steps :
+				for seq in part or () : yield search.result(seq)
+
+
+	# Many patterns (e.g. standing alert rules) against the store in one incremental BFS : the patterns
+	#  are combined in a MultiPattern, so a prefix live in several of them is looked up once per step.
+	#  Returns a list of results per pattern, in the order of patterns, each the same as match() would
+	#  return for it ([] instead of None). A pattern stops at its first step with results and its states
+	#  are dropped from the frontier, limit/policy/max_steps apply to the shared frontier, opts as in match()
+	def match_multi(self, patterns, match_prefix_fun=None, head=None, limit=None, max_steps=10, end='.', match_prefixes_fun=None, **opts):
+
+		search = self.search(patterns, match_prefix_fun, match_prefixes_fun, head, limit, end, multi=True, **opts)
+		for _ in search.steps(max_steps) : pass
+		return search.returns(search.found)
+
+
+	#Async lookups for a step : every prefix is looked up concurrently, at most concurrency at a time
+	#  step_timeout : seconds for all the lookups of a step, raises asyncio.TimeoutError
+	#  the pending lookups are cancelled if the step fails, times out or amatch() is cancelled
+	async def anext_seq_syms(self, prefixes, afun=None, batch_afun=None, head=None, end='.', sem=None, step_timeout=None, allowed=None, **hints):
+		if len(prefixes) == 0 : return []
+		if batch_afun is not None :
+			if allowed is not None : hints['allowed'] = allowed
+			return await asyncio.wait_for(batch_afun(prefixes=prefixes, head=head, end=end, **hints), step_timeout)
+
+		async def lookup(prefix, a) :
+			async with sem :
+				if allowed is None : return await afun(prefix=prefix, head=head, end=end, **hints)
+				return await afun(prefix=prefix, head=head, end=end, allowed=a, **hints)
+
+		tasks = [ asyncio.ensure_future(lookup(p, a)) for p, a in zip(prefixes, allowed or [None] * len(prefixes)) ]
+		try : return await asyncio.wait_for(asyncio.gather(*tasks), step_timeout)
+		except BaseException :
+			for t in tasks : t.cancel()
+			raise
+
+	# Same as match() for async sequence-stores, the results are identical
+	#  match_prefix_afun(prefix, head, end) / match_prefixes_afun(prefixes, head, end) are coroutines,
+	#  and match_suffix_afun/match_suffixes_afun over the reversed sequences, opts as in match()
+	async def amatch(self, regex, match_prefix_afun=None, head=None, limit=None, max_steps=10, end='.', match_prefixes_afun=None,
+			concurrency=64, step_timeout=None, match_suffix_afun=None, match_suffixes_afun=None, **opts):
+
+		search = self.search(regex, match_prefix_afun, match_prefixes_afun, head, limit, end,
+			match_suffix_fun=match_suffix_afun, match_suffixes_fun=match_suffixes_afun, is_async=True, **opts)
+		res = None
+		steps = search.asteps(max_steps, asyncio.Semaphore(concurrency), step_timeout)
+		try :
+			async for part in steps :
+				res = search.collect(part)
+				if res is not None : break
+		finally :
+			await steps.aclose()
+		return search.returns(res)
+
+
+# One match call over a store, built by Regex.search() and run by match(), iter_match(), match_multi() and amatch()
+#  frontier : prefix => interned state ids, a SpillFrontier with max_frontier_bytes
+#  A step is select (policy) => allowed (pushdown filters) => lookup (store) => filter (filter_sas) => record (trace),
+#  over the whole frontier, over its chunks when spilled or one prefix at a time when streamed
+#  backward : the reversed pattern is matched over the suffix store, result() flips the seqs back
+#  found/done : results per pattern and the finished patterns of a MultiPattern, found is None for a Pattern
+class Search(object):
+
+	def __init__(self, rx, pattern, fun=None, batch_fun=None, head=None, end='.', policy=None, trace=None, auto_head=True,
+			backward=False, max_frontier_bytes=None, chunk=10000, spill_dir=None, is_async=False):
+		self.rx, self.pattern, self.end, self.trace, self.backward = rx, pattern, end, trace, backward
+		self.policy = policy if policy is not None else rx.frontier_policy(batched=batch_fun is not None)
+		store = batch_fun or fun
+		self.hints, self.pushdown, self.filters = rx.store_hints(pattern, store), rx.takes(store, 'allowed'), {}
+		if trace is not None :
+			timed = trace.atimed if is_async else trace.timed
+			fun, batch_fun = timed(fun), timed(batch_fun)
+		self.fun, self.batch_fun = fun, batch_fun
+		self.spill = None if max_frontier_bytes is None else (max_frontier_bytes, chunk, spill_dir)
+		self.head, start, self.trans = rx.start_frontier(self.pattern, head, auto_head)
+		self.frontier = self.new_frontier()
+		self.frontier.update(start)
+		self.found = [ [] for _ in pattern.patterns ] if isi(pattern, MultiPattern) else None
+		self.done, self.hit, self.full, self.stats = set(), set(), [], None
+
+	def new_frontier(self): return {} if self.spill is None else SpillFrontier(*self.spill)
+
+	#nothing left to look up
+	def finished(self):
+		return len(self.frontier) == 0 or (self.found is not None and len(self.done) == len(self.found))
+
+	#the BFS : yields the full seqs of every part as it is filtered and None when a step is complete,
+	#  until max_steps or nothing is left. Spilled entries are removed when it stops, also on errors
+	def steps(self, max_steps, stream=False):
+		nxt = None
+		try :
+			for i in range(max_steps + 1) :
+				if self.finished() : break
+				nxt = self.begin()
+				for part in self.parts(stream) :
+					prefixes = list(part)
+					t0 = time.perf_counter() if self.trace is not None else None
+					preds = self.rx.next_seq_syms(prefixes, fun=self.fun, batch_fun=self.batch_fun, head=self.head, end=self.end,
+						allowed=self.allowed(part, prefixes), **self.hints)
+					yield self.absorb(part, prefixes, preds, nxt, t0)
+				self.finish(i, nxt)
+				yield None
+		finally :
+			self.close(nxt)
+
+	#steps() with the async lookups of anext_seq_syms()
+	async def asteps(self, max_steps, sem, step_timeout):
+		nxt = None
+		try :
+			for i in range(max_steps + 1) :
+				if self.finished() : break
+				nxt = self.begin()
+				for part in self.parts() :
+					prefixes = list(part)
+					t0 = time.perf_counter() if self.trace is not None else None
+					preds = await self.rx.anext_seq_syms(prefixes, afun=self.fun, batch_afun=self.batch_fun, head=self.head, end=self.end,
+						sem=sem, step_timeout=step_timeout, allowed=self.allowed(part, prefixes), **self.hints)
+					yield self.absorb(part, prefixes, preds, nxt, t0)
+				self.finish(i, nxt)
+				yield None
+		finally :
+			self.close(nxt)
+
+	#the frontier after the policy, in parts looked up and filtered together : the chunks of a spilled
+	#  frontier (no policy there), single prefixes when streaming single lookups, else all of it
+	def parts(self, stream=False):
+		if self.spill is not None : yield from self.frontier.chunks()
+		elif stream and self.batch_fun is None :
+			for prefix, ids in self.select(self.frontier).items() : yield { prefix : ids }
+		else : yield self.select(self.frontier)
+
+	def select(self, part):
+		if self.trace is None : return self.policy.select(part)
+		t0 = time.perf_counter()
+		part = self.policy.select(part)
+		self.stats['select_time'] += time.perf_counter() - t0
+		return part
+
+	#symbol filters of the prefixes, for the stores that take allowed
+	def allowed(self, part, prefixes):
+		return self.rx.allowed_syms(self.pattern, part, prefixes, self.end, self.filters) if self.pushdown else None
+
+	def begin(self):
+		self.hit, self.full = set(), []
+		if self.trace is not None :
+			self.stats = { 'prefixes': len(self.frontier), 'selected': 0, 'sets': {}, 'rows': 0, 'full': 0,
+				'select_time': 0.0, 'store_time': 0.0, 'filter_time': 0.0, 'peak': getattr(self.frontier, 'peak', 0) }
+		return self.new_frontier()
+
+	#filter the looked up seqs of a part into the next frontier nxt, returns the full seqs
+	#  with a MultiPattern they also go to the unfinished patterns accepting at their prefix
+	def absorb(self, part, prefixes, preds, nxt, t0=None):
+		if self.trace is not None : t1 = time.perf_counter()
+		self.policy.spent(len(prefixes))
+		full_seqs, expanded = self.rx.filter_sas(self.pattern, part, prefixes, preds, self.end, self.trans)
+		if self.found is not None and len(full_seqs) > 0 :
+			for prefix, seqs in zip(prefixes, preds) :
+				for seq in seqs :
+					if seq[-1] != self.end : continue
+					for k in self.pattern.ends(part[prefix]) :
+						if k in self.done : continue
+						self.found[k].append(self.result(seq))
+						self.hit.add(k)
+		nxt.update(expanded)
+		if self.trace is not None :
+			st = self.stats
+			st['store_time'] += t1 - t0
+			st['filter_time'] += time.perf_counter() - t1
+			for ids in part.values() : st['sets'][ids] = ids
+			st['selected'], st['rows'], st['full'] = st['selected'] + len(prefixes), st['rows'] + sum(map(len, preds)), st['full'] + len(full_seqs)
+			if self.spill is not None : st['peak'] = max(st['peak'], self.frontier.bytes + nxt.bytes)
+		return full_seqs
+
+	#the next frontier becomes the frontier, finished patterns are not expanded any further
+	def finish(self, i, nxt):
+		if len(self.hit) > 0 :
+			self.done |= self.hit
+			nxt = self.prune(nxt)
+		if self.trace is not None :
+			st = self.stats
+			extra = {} if self.spill is None else { 'frontier_bytes': st['peak'], 'spilled': nxt.spilled }
+			self.trace.record(i, st['prefixes'], st['selected'], st['sets'], st['rows'], len(nxt) + st['full'], st['full'],
+				st['select_time'], st['store_time'], st['filter_time'], **extra)
+		self.close(self.frontier)
+		self.frontier, self.head = nxt, None #head is only needed on the first step
+
+	#frontier without the states of the finished patterns
+	def prune(self, frontier):
+		kept, pruned = self.new_frontier(), {}
+		for part in (frontier.chunks() if self.spill is not None else [frontier]) :
+			left = {}
+			for seq, ids in part.items() :
+				if ids not in pruned :
+					rest = self.pattern.without(ids, self.done)
+					pruned[ids] = self.trans.setdefault(rest, rest)
+				if len(pruned[ids]) > 0 : left[seq] = pruned[ids]
+			kept.update(left)
+		return kept
+
+	#remove the spilled entries of the frontiers
+	def close(self, nxt=None):
+		for frontier in (self.frontier, nxt) :
+			if isi(frontier, SpillFrontier) : frontier.close()
+
+	#match() result of a step : collects the parts of the step, at its end the full seqs if there are any
+	#  or the frontier ran out ([]), else None to go on
+	def collect(self, part):
+		if part is not None : self.full.extend(part)
+		elif len(self.full) > 0 or len(self.frontier) == 0 : return [ self.result(seq) for seq in self.full ]
+		return None
+
+	#a full seq as returned : flipped back when matched backward, lists for non-string sequences
+	def result(self, seq):
+		if self.backward : seq = seq[-2::-1] + seq[-1:]
+		return seq if self.pattern.is_str else list(seq)
+
+	def returns(self, res): return res if self.trace is None else (res, self.trace)
 
 #----------------------------------------------------------------------		
 
@@ -1,4 +1,9 @@
+import sys
+import asyncio
 from functools import partial
+from inspect import signature
+from literals import contains
+from lru import LRU
 
 isi = isinstance
 
@@ -6,22 +11,243 @@ words = ['who','why','when','where', 'whom','which','what','word','while','whole
 seqs  = [[1,2,3], [1,2,3,4], [1,3,4], [1,2,5,6], [1,2,5,7], [1,2,3,4,5], [1,1,3,4]]
 sents = [['hi', 'world'], ['hello', 'world'], ['howdy', 'world'], ['hi', 'buddy'], ['hey', 'ho'], ['hi','hi']]
 
-def db_search(prefix, seqs=seqs, head=None, end='.'):
-	islst = isi(prefix, list)
+#prefix/head may be str or sequence, list-sequences are compared as tuples (no str()/eval())
+#  results have the type of the prefix : str, tuple or list
+#  required : literal runs the sequence has to contain, pushed down by Regex.match
+#  allowed : the acceptable next symbols (the end marker included), None for any
+def db_search(prefix, seqs=seqs, head=None, end='.', required=None, allowed=None):
+	islst = not isi(prefix, str)
 	full_prefix = prefix if head is None else head + prefix
+	if islst : full_prefix = tuple(full_prefix) if head is None else tuple(head) + tuple(prefix)
 	res = set()
-	pp = len(full_prefix) + 1
-	seqs = [ ( w + [end] if islst else w + end ) for w in seqs ]
+	pp = len(full_prefix)
+	stop = (end,) if islst else end
 	for word in seqs :
-		if islst : #seq as list case
-			if full_prefix == word[:len(full_prefix)] and word != full_prefix :
-				res.add(str(word[:pp]))
-		else : # seq as string case	
-			if word.startswith(full_prefix) and word != full_prefix :
-				res.add(word[:pp])
-	return [ eval(r) for r in res ] if islst else list(res)	
+		if islst : word = tuple(word)
+		if len(word) < pp or word[:pp] != full_prefix : continue
+		if allowed is not None and (word[pp] if len(word) > pp else end) not in allowed : continue
+		if required and not all(contains(word, r) for r in required) : continue
+		res.add(word[:pp+1] if len(word) > pp else full_prefix + stop)
+	return [ list(r) for r in res ] if isi(prefix, list) else list(res)
+
+#batched db_search() : one pass over seqs for all the prefixes
+#  returns a list of predictions per prefix, in the order of prefixes
+#  allowed : symbol filters aligned with prefixes, see db_search()
+def db_search_many(prefixes, seqs=seqs, head=None, end='.', required=None, allowed=None):
+	if len(prefixes) == 0 : return []
+	islst = not isi(prefixes[0], str)
+	if islst : full = [ tuple(p) if head is None else tuple(head) + tuple(p) for p in prefixes ]
+	else : full = [ p if head is None else head + p for p in prefixes ]
+	res = { f : set() for f in full }
+	filters = {} if allowed is None else { f : a for f, a in zip(full, allowed) if a is not None }
+	lens = { len(f) for f in full }
+	for w in seqs :
+		if required and not all(contains(w, r) for r in required) : continue
+		word = tuple(w) + (end,) if islst else w + end
+		for l in lens :
+			if len(word) > l and word[:l] in res :
+				if word[:l] in filters and word[l] not in filters[word[:l]] : continue
+				res[word[:l]].add(word[:l+1])
+	aslst = isi(prefixes[0], list)
+	return [ [ list(r) for r in res[f] ] if aslst else list(res[f]) for f in full ]
+
+
+# Base of the prefix stores : the match_prefix_fun / match_prefixes_fun contract of db_search()
+#  on top of children(prefix, end, allowed), which a store implements together with count(prefix)
+class Store(object):
+
+	#head+prefix, list-sequences as tuples
+	def full(self, prefix, head):
+		if isi(prefix, str) : return prefix if head is None else head + prefix
+		return tuple(prefix) if head is None else tuple(head) + tuple(prefix)
+
+	#full+next-symbol per symbol, in the type of the prefix : str, tuple or list
+	def results(self, prefix, full, syms):
+		if isi(prefix, str) : return [ full + s for s in syms ]
+		res = [ full + (s,) for s in syms ]
+		return [ list(r) for r in res ] if isi(prefix, list) else res
+
+	#same contract as db_search() : prefix+next-symbol for every continuation of head+prefix
+	def search(self, prefix, head=None, end='.', allowed=None):
+		full = self.full(prefix, head)
+		return self.results(prefix, full, self.children(full, end, allowed))
+
+	__call__ = search
+
+	def search_many(self, prefixes, head=None, end='.', allowed=None):
+		if allowed is None : allowed = [None] * len(prefixes)
+		return [ self.search(p, head=head, end=end, allowed=a) for p, a in zip(prefixes, allowed) ]
+
+
+# In-memory prefix index (trie) over strings, int-sequences or word-sequences
+#  every node is a dict : next-symbol => child node, the None key marks end-of-sequence
+#  and the () key holds the number of sequences under the node (see count())
+#  Usable directly as match_prefix_fun / match_prefixes_fun :
+#    n.match('wh..', TrieStore(words))  or  n.match('wh..', match_prefixes_fun=TrieStore(words).search_many)
+class TrieStore(Store):
+
+	END, COUNT = None, ()
+
+	def __init__(self, seqs=()):
+		self.root = { self.COUNT : 0 }
+		self.size = 0
+		for seq in seqs : self.add(seq)
+
+	def add(self, seq):
+		node = self.node(seq)
+		if node is not None and self.END in node : return #already in
+		node = self.root
+		node[self.COUNT] += 1
+		for sym in seq :
+			nxt = node.get(sym)
+			if nxt is None : nxt = node[sym] = { self.COUNT : 0 }
+			nxt[self.COUNT] += 1
+			node = nxt
+		node[self.END] = True
+		self.size += 1
+
+	def __len__(self): return self.size
+
+	def node(self, prefix):
+		node = self.root
+		for sym in prefix :
+			node = node.get(sym)
+			if node is None : return None
+		return node
+
+	#next symbols after the prefix, end-of-sequence is reported as 'end'
+	#  allowed : only these symbols, kept in insertion order
+	def children(self, prefix, end='.', allowed=None):
+		node = self.node(prefix)
+		if node is None : return []
+		syms = [ end if sym is None else sym for sym in node if sym != self.COUNT ]
+		return syms if allowed is None else [ sym for sym in syms if sym in allowed ]
+
+	#number of sequences starting with prefix, usable as frontier.Beam score
+	def count(self, prefix):
+		node = self.node(prefix)
+		return 0 if node is None else node[self.COUNT]
+
+
+# Reverse index : TrieStore over the reversed sequences, the match_suffix_fun of Regex.match()
+#  lookups take and return sequences read right-to-left, e.g. search('gn') => ['gni', 'gnu', ...]
+class SuffixStore(TrieStore):
+
+	def add(self, seq): super().add(seq[::-1])
+
+
+# Async stand-in for remote sequence-stores : wraps any sync store, optionally with
+#  simulated per-call latency. Usable as match_prefix_afun / match_prefixes_afun of Regex.amatch()
+class AsyncStore(object):
+
+	def __init__(self, store, latency=0.0):
+		self.store = store
+		self.latency = latency
+		self.calls = 0
+		#symbol filters are forwarded only if the wrapped store takes them
+		try : self.pushdown = 'allowed' in signature(store).parameters
+		except (TypeError, ValueError) : self.pushdown = False
+
+	async def search(self, prefix, head=None, end='.', allowed=None):
+		self.calls += 1
+		if self.latency > 0 : await asyncio.sleep(self.latency)
+		if self.pushdown : return self.store(prefix, head=head, end=end, allowed=allowed)
+		return self.store(prefix, head=head, end=end)
+
+	__call__ = search
+
+	async def search_many(self, prefixes, head=None, end='.', allowed=None):
+		self.calls += 1
+		if self.latency > 0 : await asyncio.sleep(self.latency)
+		if self.pushdown and allowed is not None :
+			return [ self.store(p, head=head, end=end, allowed=a) for p, a in zip(prefixes, allowed) ]
+		return [ self.store(p, head=head, end=end) for p in prefixes ]
+
+
+#approximate bytes held by a cached lookup result
+def sizeof(res):
+	return sys.getsizeof(res) + sum( sys.getsizeof(r) for r in res )
+
+# Caching wrapper over a match_prefix_fun and/or match_prefixes_fun, shared across match() calls
+#  lookups are keyed on (head+prefix, end), list-prefixes as tuples, so 'h..' with head 'w' and 'wh..'
+#  share entries. The unfiltered continuations are cached and the allowed filter applied on the way out
+#    cached = CachedStore(store, batch_fun=store.search_many, maxsize=100000, ttl=60, maxbytes=2**26)
+#    n.match('wh.r..', cached) ; n.match('wh.+', match_prefixes_fun=cached.search_many)
+#  When the store changes call invalidate(seq) for every added/removed sequence or invalidate() for all
+class CachedStore(object):
+
+	def __init__(self, fun=None, batch_fun=None, maxsize=100000, ttl=None, maxbytes=None):
+		self.fun, self.batch_fun = fun, batch_fun
+		self.cache = LRU(maxsize=maxsize, ttl=ttl, maxbytes=maxbytes, sizeof=sizeof)
+		self.calls = 0 # calls to the wrapped functions
+		self.ends = set() # end markers in use, see invalidate()
+
+	def key(self, prefix, head, end):
+		self.ends.add(end)
+		if isi(prefix, str) : return (prefix if head is None else head + prefix), end
+		return (tuple(prefix) if head is None else tuple(head) + tuple(prefix)), end
+
+	#results as tuples (list-sequences) with the allowed filter applied, in the type of the prefix
+	def results(self, prefix, res, allowed):
+		if allowed is not None : res = [ r for r in res if r[-1] in allowed ]
+		return [ list(r) for r in res ] if isi(prefix, list) else list(res)
+
+	def fetch(self, full, end):
+		self.calls += 1
+		if self.fun is not None : res = self.fun(full, end=end)
+		else : res = self.batch_fun([full], end=end)[0]
+		return tuple( r if isi(r, str) else tuple(r) for r in res )
+
+	def search(self, prefix, head=None, end='.', allowed=None):
+		key = self.key(prefix, head, end)
+		res = self.cache.get(key)
+		if res is None :
+			res = self.fetch(*key)
+			self.cache.put(key, res)
+		return self.results(prefix, res, allowed)
+
+	__call__ = search
+
+	#only the missing prefixes go to the store, in one batch_fun call if there is one
+	def search_many(self, prefixes, head=None, end='.', allowed=None):
+		keys = [ self.key(p, head, end) for p in prefixes ]
+		found = { k : self.cache.get(k) for k in keys }
+		missing = [ k for k, r in found.items() if r is None ]
+		if len(missing) > 0 and self.batch_fun is not None :
+			self.calls += 1
+			for k, res in zip(missing, self.batch_fun([ full for full, _ in missing ], end=end)) :
+				found[k] = tuple( r if isi(r, str) else tuple(r) for r in res )
+				self.cache.put(k, found[k])
+		else :
+			for k in missing :
+				found[k] = self.fetch(*k)
+				self.cache.put(k, found[k])
+		if allowed is None : allowed = [None] * len(prefixes)
+		return [ self.results(p, found[k], a) for p, k, a in zip(prefixes, keys, allowed) ]
+
+	#Invalidation hooks : seq was added to or removed from the store, only the lookups of
+	#  its prefixes change ; with no seq drop everything. The stats are kept, see reset_stats()
+	def invalidate(self, seq=None):
+		if seq is None : return self.cache.clear()
+		if not isi(seq, str) : seq = tuple(seq)
+		for end in self.ends :
+			for i in range(len(seq) + 1) : self.cache.pop((seq[:i], end))
+
+	def reset_stats(self):
+		self.cache.reset_stats()
+		self.calls = 0
+
+	def stats(self):
+		c = self.cache
+		lookups = c.hits + c.misses
+		return { 'hits': c.hits, 'misses': c.misses, 'hit_rate': c.hits / lookups if lookups > 0 else 0.0,
+			'evictions': c.evictions, 'expirations': c.expirations, 'size': len(c), 'bytes': c.bytes, 'calls': self.calls }
 
 
 seq_search   = partial(db_search,seqs=seqs) 
 words_search = partial(db_search,seqs=words)
 sents_search = partial(db_search,seqs=sents)
+
+seq_search_many   = partial(db_search_many,seqs=seqs)
+words_search_many = partial(db_search_many,seqs=words)
+sents_search_many = partial(db_search_many,seqs=sents)
@@ -0,0 +1,85 @@
+# Frontier with a memory ceiling for very broad matches : prefix => NFA state ids entries are kept
+#  in memory up to max_bytes, then the buffered entries are written to a temp file and dropped.
+#  State-sets are stored once, entries keep only their index, and a spilled chunk is front-coded :
+#  sorted by prefix, every entry is (symbols shared with the previous prefix, the rest, state-set index).
+#  The frontier is consumed chunk by chunk, see Regex.match(max_frontier_bytes=...)
+import os
+import sys
+import pickle
+import tempfile
+from frontier import seq_key
+
+ENTRY = 100 #estimated bytes of a dict entry + the interned state-set reference
+
+#length of the common prefix, symbols of different types (1 and 1.0) are not shared
+def shared(a, b):
+	n, i = min(len(a), len(b)), 0
+	while i < n and a[i] == b[i] and type(a[i]) is type(b[i]) : i += 1
+	return i
+
+
+class SpillFrontier(object):
+
+	def __init__(self, max_bytes=2**26, chunk=10000, dir=None):
+		self.max_bytes, self.chunk, self.dir = max_bytes, chunk, dir
+		self.mem = {} # prefix => state ids
+		self.bytes = self.peak = 0 # estimated bytes of mem, and its maximum
+		self.sets, self.set_list = {}, [] # state-set => index, index => state-set
+		self.files = [] # spilled chunks
+		self.size = self.spilled = 0
+
+	def __len__(self): return self.size
+
+	def add(self, prefix, ids):
+		self.mem[prefix] = ids
+		self.size += 1
+		self.bytes += sys.getsizeof(prefix) + ENTRY
+		if self.bytes > self.peak : self.peak = self.bytes
+		if self.bytes > self.max_bytes : self.spill()
+
+	def update(self, frontier):
+		for prefix, ids in frontier.items() : self.add(prefix, ids)
+
+	def index(self, ids):
+		i = self.sets.get(ids)
+		if i is None :
+			i = self.sets[ids] = len(self.set_list)
+			self.set_list.append(ids)
+		return i
+
+	#write the buffered entries to a temp file, front-coded
+	def spill(self):
+		entries, last = [], None
+		for p in sorted(self.mem, key=seq_key) :
+			n = 0 if last is None else shared(last, p)
+			entries.append((n, p[n:], self.index(self.mem[p])))
+			last = p
+		fd, path = tempfile.mkstemp(suffix='.frontier', dir=self.dir)
+		with os.fdopen(fd, 'wb') as f :
+			pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+		self.files.append(path)
+		self.spilled += len(self.mem)
+		self.mem, self.bytes = {}, 0
+
+	#consume the frontier : dicts of at most chunk entries, the spilled ones first
+	def chunks(self):
+		while len(self.files) > 0 :
+			path = self.files.pop(0)
+			with open(path, 'rb') as f : entries = pickle.load(f)
+			os.remove(path)
+			part, p = {}, None
+			for n, rest, k in entries :
+				p = rest if n == 0 else p[:n] + rest
+				part[p] = self.set_list[k]
+				if len(part) == self.chunk :
+					yield part
+					part = {}
+			if len(part) > 0 : yield part
+		items, self.mem, self.bytes = list(self.mem.items()), {}, 0
+		for i in range(0, len(items), self.chunk) : yield dict(items[i:i+self.chunk])
+
+	#remove the spilled chunks not consumed
+	def close(self):
+		for path in self.files :
+			if os.path.exists(path) : os.remove(path)
+		self.files = []
@@ -0,0 +1,210 @@
+# SQLite sequence-store : the prefix index of TrieStore kept in a table, one row per (prefix, next symbol)
+#  usable as match_prefix_fun / match_prefixes_fun like TrieStore :
+#    store = SQLiteStore('words.db').load(words)
+#    n.match('wh.r..', store)  or  n.match('wh.r..', match_prefixes_fun=store.search_many)
+import sys
+sys.path.extend(["../"])
+
+import os
+import sqlite3
+from queue import Queue, Empty
+from threading import Lock
+from itertools import count
+from contextlib import contextmanager
+from seqs_store import Store
+
+isi = isinstance
+
+SCHEMA = [
+	#sym '' is the end of a sequence, cnt : number of sequences starting with prefix+sym
+	'CREATE TABLE IF NOT EXISTS next (prefix TEXT NOT NULL, sym TEXT NOT NULL, cnt INTEGER NOT NULL, PRIMARY KEY (prefix, sym)) WITHOUT ROWID',
+	'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)',
+]
+
+#fixed number of prefixes per batched query, the last batch is padded, so there is
+# one statement for sqlite3 to prepare and cache
+BATCH = 256
+
+#symbol separator in the keys of int/word sequences
+SEP = '\x1f'
+
+# Bounded pool of connections, shared by the threads of a process
+#  a forked child inherits the parent's open connections, which sqlite3 can not share across
+#  processes : the pool is keyed on the pid and starts empty in the child (the copies are left alone)
+class Pool(object):
+
+	def __init__(self, connect, size=4):
+		self.connect = connect
+		self.size = size
+		self.reset()
+
+	def reset(self):
+		self.pid = os.getpid()
+		self.idle = Queue()
+		self.opened = 0
+		self.lock = Lock()
+
+	@contextmanager
+	def conn(self):
+		if self.pid != os.getpid() : self.reset()
+		try : c = self.idle.get_nowait()
+		except Empty :
+			with self.lock :
+				new = self.opened < self.size
+				if new : self.opened += 1
+			c = self.connect() if new else self.idle.get()
+		try : yield c
+		finally : self.idle.put(c)
+
+	def close(self):
+		if self.pid != os.getpid() : return self.reset()
+		while True :
+			try : self.idle.get_nowait().close()
+			except Empty : break
+		self.opened = 0
+
+
+# kind : 'str' sequences of characters, 'int' of numbers or 'word' of strings,
+#  guessed from the first loaded sequence and kept in the db
+class SQLiteStore(Store):
+
+	names = count() #names of the shared in-memory dbs
+
+	def __init__(self, path=None, kind=None, pool_size=4):
+		#in-memory db shared by the connections of the pool
+		self.path = path if path is not None else f'file:seqs{next(SQLiteStore.names)}?mode=memory&cache=shared'
+		self.pool_size = pool_size
+		self.pool = Pool(self.connect, pool_size)
+		self.queries = 0
+		with self.pool.conn() as c :
+			for sql in SCHEMA : c.execute(sql)
+			row = c.execute("SELECT value FROM meta WHERE key = 'kind'").fetchone()
+		self.kind = row[0] if row is not None else kind
+
+	def connect(self):
+		c = sqlite3.connect(self.path, uri=self.path.startswith('file:'), check_same_thread=False, cached_statements=256)
+		if not self.path.startswith('file:') : c.execute('PRAGMA journal_mode=WAL')
+		#keys of the sequences of a load() batch, temp tables are per connection
+		c.execute('CREATE TEMP TABLE batch (prefix TEXT PRIMARY KEY) WITHOUT ROWID')
+		return c
+
+	@property
+	def in_memory(self): return self.path.startswith('file:') and 'mode=memory' in self.path
+
+	#connections can not be pickled : the copy re-opens the same db file (e.g. in match_sharded() workers),
+	#  an in-memory db would reopen empty in another process, so it can not be pickled
+	def __reduce__(self):
+		if self.in_memory : raise TypeError('in-memory SQLiteStore can not be pickled, open it with a file path')
+		return (SQLiteStore, (self.path, self.kind, self.pool_size))
+
+	def close(self): self.pool.close()
+
+	#prefix => text key, sym text => symbol
+	def key(self, seq):
+		if self.kind == 'str' : return seq
+		return ''.join(str(s) + SEP for s in seq)
+
+	def sym(self, txt):
+		return int(txt) if self.kind == 'int' else txt
+
+	#allowed symbols => their sym texts in the table, the end marker is ''
+	def sym_texts(self, allowed, end):
+		txts = { '' } if end in allowed else set()
+		for s in allowed :
+			if isi(s, int) if self.kind == 'int' else isi(s, str) : txts.add(str(s))
+		return sorted(txts)
+
+	#Bulk loader : the sequences are written batch at a time, see flush()
+	#  a sequence already in the db is skipped, also across load() calls
+	#  kind is taken from the first non-empty sequence
+	def load(self, seqs, batch=100000):
+		pending, n = {}, 0 # key => seq
+		with self.pool.conn() as c :
+			c.execute('PRAGMA synchronous=OFF')
+			for seq in seqs :
+				if self.kind is None and len(seq) > 0 :
+					self.kind = 'str' if isi(seq, str) else 'int' if isi(seq[0], int) else 'word'
+					c.execute("INSERT OR REPLACE INTO meta VALUES ('kind', ?)", (self.kind,))
+				pending[self.key(seq)] = seq
+				if len(pending) >= batch : n += self.flush(c, pending)
+			n += self.flush(c, pending)
+			c.execute("INSERT OR IGNORE INTO meta VALUES ('size', 0)")
+			c.execute("UPDATE meta SET value = value + ? WHERE key = 'size'", (n,))
+			c.commit()
+			c.execute('PRAGMA synchronous=FULL')
+		return self
+
+	#one batch in one transaction : the keys go to the temp table with executemany, the ones without
+	#  an end row in the db (anti-join) are new, and their (prefix, sym) counts + end rows are aggregated
+	#  in memory and upserted with executemany. Returns the number of new sequences
+	def flush(self, c, pending):
+		if len(pending) == 0 : return 0
+		c.executemany('INSERT INTO batch VALUES (?)', ( (k,) for k in pending ))
+		new = [ k for k, in c.execute("SELECT prefix FROM batch WHERE NOT EXISTS (SELECT 1 FROM next WHERE next.prefix = batch.prefix AND sym = '')") ]
+		c.execute('DELETE FROM batch')
+		rows = {}
+		for k in new :
+			prefix = ''
+			for s in pending[k] :
+				s = str(s)
+				rows[(prefix, s)] = rows.get((prefix, s), 0) + 1
+				prefix += s if self.kind == 'str' else s + SEP
+			rows[(k, '')] = 1
+		c.executemany('INSERT INTO next VALUES (?,?,?) ON CONFLICT (prefix, sym) DO UPDATE SET cnt = cnt + excluded.cnt',
+			( (p, s, n) for (p, s), n in rows.items() ))
+		c.commit()
+		pending.clear()
+		return len(new)
+
+	def __len__(self):
+		with self.pool.conn() as c :
+			row = c.execute("SELECT value FROM meta WHERE key = 'size'").fetchone()
+		return 0 if row is None else int(row[0])
+
+	#next symbols after the prefix, end-of-sequence is reported as 'end'
+	#  allowed : only these rows are read, sym IN (...) in the query
+	def children(self, prefix, end='.', allowed=None):
+		sql, args = 'SELECT sym FROM next WHERE prefix = ?', [self.key(prefix)]
+		if allowed is not None :
+			txts = self.sym_texts(allowed, end)
+			if len(txts) == 0 : return []
+			sql += f' AND sym IN ({",".join("?" * len(txts))})'
+			args += txts
+		self.queries += 1
+		with self.pool.conn() as c :
+			rows = c.execute(sql, args).fetchall()
+		return [ end if s == '' else self.sym(s) for s, in rows ]
+
+	#number of sequences starting with prefix, usable as frontier.Beam score
+	def count(self, prefix):
+		if len(prefix) == 0 : return len(self)
+		with self.pool.conn() as c :
+			row = c.execute('SELECT cnt FROM next WHERE prefix = ? AND sym = ?', (self.key(prefix[:-1]), str(prefix[-1]))).fetchone()
+		return 0 if row is None else row[0]
+
+	#batched search : the prefixes are looked up BATCH at a time with one prepared IN (...) query,
+	#  with allowed the (prefix, sym) pairs to read are looked up BATCH at a time with (prefix, sym) IN (VALUES ...)
+	def search_many(self, prefixes, head=None, end='.', allowed=None):
+		if len(prefixes) == 0 : return []
+		fulls = [ self.full(p, head) for p in prefixes ]
+		keys = [ self.key(f) for f in fulls ]
+		if allowed is None : allowed = [None] * len(prefixes)
+		texts = [ None if a is None else self.sym_texts(a, end) for a in allowed ]
+		every = { k : None for k, t in zip(keys, texts) if t is None } # prefixes with any symbol
+		pairs = { (k, x) : None for k, t in zip(keys, texts) if t is not None for x in t } # (prefix, sym) to read
+		found = { k : [] for k in every }
+		with self.pool.conn() as c :
+			sql = f'SELECT prefix, sym FROM next WHERE prefix IN ({",".join("?" * BATCH)})'
+			for p, s in self.rows(c, sql, list(every)) : found[p].append(s)
+			sql = f'SELECT prefix, sym FROM next WHERE (prefix, sym) IN (VALUES {",".join(["(?,?)"] * BATCH)})'
+			pairs = set(self.rows(c, sql, list(pairs), 2))
+		return [ self.results(p, f, [ end if s == '' else self.sym(s) for s in (found[k] if t is None else [ x for x in t if (k, x) in pairs ]) ])
+			for p, f, k, t in zip(prefixes, fulls, keys, texts) ]
+
+	#rows of the batched query over args, BATCH values (of width values each) at a time
+	def rows(self, c, sql, args, width=1):
+		for i in range(0, len(args), BATCH) :
+			chunk = args[i:i+BATCH]
+			chunk += chunk[:1] * (BATCH - len(chunk))
+			self.queries += 1
+			yield from c.execute(sql, chunk if width == 1 else [ v for vals in chunk for v in vals ])
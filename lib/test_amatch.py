@@ -0,0 +1,43 @@
+import asyncio
+from regex_nfa import *
+from seqs_store import *
+from check_utils import Checks
+
+tests = [
+	['why', words], ['wh.+', words], ['wh.r.', words], ['wh..', words], ['w(h|o).', words], ['x.+', words],
+	['(ab|ba)', ['aa','ab','ba','bb']],
+	[[1,'.',3,'.'], seqs], [['(','hi','|','hey',')','.'], sents],
+]
+
+async def arun(tests) :
+	n = Regex()
+	check = Checks()
+
+	print("\n>> same results as match()")
+	for i,(regex, data) in enumerate(tests) :
+		store = TrieStore(data)
+		expected = n.match(regex, store)
+		res = await n.amatch(regex, AsyncStore(store), concurrency=2)
+		res_many = await n.amatch(regex, match_prefixes_afun=AsyncStore(store).search_many)
+		check(f'{i}> {regex} >> {res}', res == expected and res_many == expected)
+	check('head', await n.amatch('h..', AsyncStore(TrieStore(words)), head='w') == n.match('h..', TrieStore(words), head='w'))
+
+	print("\n>> timeouts and cancellation")
+	slow = AsyncStore(TrieStore(words), latency=0.5)
+	try :
+		await n.amatch('wh..', slow, step_timeout=0.05)
+		check('step timeout raises', False)
+	except asyncio.TimeoutError : check('step timeout raises', True)
+
+	task = asyncio.ensure_future(n.amatch('wh..', slow))
+	await asyncio.sleep(0.05)
+	task.cancel()
+	try :
+		await task
+		check('cancel', False)
+	except asyncio.CancelledError : check('cancel', True)
+
+	check.summary()
+
+
+asyncio.run(arun(tests))
@@ -0,0 +1,71 @@
+from regex_nfa import *
+from seqs_store import *
+from check_utils import Checks
+
+class Clock(object):
+	t = 0.0
+	def __call__(self): return self.t
+
+def run() :
+	n = Regex()
+	check = Checks()
+
+	print("\n>> lru ttl and bytes")
+	clock = Clock()
+	lru = LRU(maxsize=10, ttl=5, clock=clock)
+	lru.put('a', 1)
+	clock.t = 4
+	check('fresh', lru.get('a') == 1)
+	clock.t = 6
+	check('expired', lru.get('a') is None and lru.expirations == 1 and len(lru) == 0)
+	check('expirations in stats', lru.stats()['expirations'] == 1)
+	lru = LRU(maxsize=None, maxbytes=10, sizeof=len)
+	for k in 'abc' : lru.put(k, 'x' * 4)
+	check('byte budget', len(lru) == 2 and lru.bytes == 8 and 'a' not in lru and lru.evictions == 1)
+	lru.put('b', 'x')
+	check('replace updates bytes', lru.bytes == 5 and lru.pop('c') == 'xxxx' and lru.bytes == 1)
+
+	print("\n>> cached store")
+	store = TrieStore(words)
+	cached = CachedStore(store)
+	res = [ n.match(r, cached) for r in ['wh..', 'wh.+', 'wh.r..'] ]
+	check('same results', res == [ n.match(r, store) for r in ['wh..', 'wh.+', 'wh.r..'] ])
+	st = cached.stats()
+	check('shared prefixes hit', st['hits'] > 0 and st['calls'] == st['misses'] == st['size'])
+	calls = cached.calls
+	check('head shares entries', n.match('h..', cached, head='w') == n.match('h..', store, head='w') and cached.calls == calls)
+	check('allowed applied on hits', cached('wh', allowed={'o'}) == ['who'] and cached('wh') == store('wh'))
+
+	cached = CachedStore(batch_fun=store.search_many)
+	check('batched', n.match('wh..', match_prefixes_fun=cached.search_many) == n.match('wh..', store) and cached.calls == 3)
+	n.match('wh.r.', match_prefixes_fun=cached.search_many)
+	check('batched misses only', cached.stats()['hits'] > 0 and cached.calls == 4)
+
+	seq_store = TrieStore(seqs)
+	cached = CachedStore(seq_store)
+	check('list prefixes', n.match([1,2,'.','+'], cached) == n.match([1,2,'.','+'], seq_store) and cached([1,2]) == seq_store([1,2]))
+	check('tuple keys', all(isi(full, tuple) for full, _ in cached.cache.data))
+
+	print("\n>> invalidation")
+	data = list(words)
+	store = TrieStore(data)
+	cached = CachedStore(store)
+	n.match('wh..', cached)
+	store.add('whoo')
+	check('stale', n.match('who.', cached) == ['whom.'])
+	cached.invalidate('whoo')
+	check('invalidate seq', sorted(n.match('who.', cached)) == ['whom.', 'whoo.'] and ('wh', '.') not in cached.cache and ('why', '.') in cached.cache)
+	hits = cached.stats()['hits']
+	cached.invalidate()
+	check('invalidate all keeps the stats', len(cached.cache) == 0 and hits > 0 and cached.stats()['hits'] == hits)
+	cached.reset_stats()
+	check('reset stats', cached.stats()['hits'] == cached.stats()['misses'] == cached.calls == 0)
+
+	cached = CachedStore(store, maxbytes=2000)
+	n.match('w.+', cached)
+	check('bytes budget', 0 < cached.stats()['bytes'] <= 2000 and cached.stats()['evictions'] > 0)
+
+	check.summary()
+
+
+run()
@@ -0,0 +1,64 @@
+from regex_nfa import *
+from seqs_store import *
+from check_utils import Checks
+
+def run() :
+	n = Regex()
+	Regex.cache.clear()
+	Regex.cache.reset_stats()
+	check = Checks()
+
+	print("\n>> cache keys")
+	p = n.compile('wh.+')
+	check('same str is a hit', n.compile('wh.+') is p and Regex.cache.hits == 1)
+	check('str vs list differ', n.compile(['w','h']) is not n.compile('wh'))
+	check('shortcut == list', n.compile(['1,|,2']) is n.compile([1,'|',2]))
+	check('pattern passthrough', n.compile(p) is p)
+
+	print("\n>> immutable")
+	try :
+		p.nfa = None
+		check('setattr raises', False)
+	except AttributeError : check('setattr raises', True)
+
+	print("\n>> shared automaton reuse")
+	check('match_one twice', n.match_one('(a|b)+c', 'abac') and n.match_one('(a|b)+c', 'babc'))
+	check('match twice', n.match('wh.r.', words_search) == n.match('wh.r.', words_search) == ['where.'])
+	ops = OPS()
+	frag = n.compile('ab').nfa
+	size = len(list(frag.states()))
+	both = ops.concat(frag, ops.closure(frag))
+	check('OPS copy frozen input', len(list(frag.states())) == size and n.match_one(Pattern(None, None, both), 'ababab'))
+	check('OPS copy keeps original', n.match_one('ab', 'ab') and not n.match_one('ab', 'abab'))
+
+	print("\n>> literal prefix")
+	check('prefix', n.compile('wh.r..').literal_prefix == 'wh' and n.compile('wh.r..').required == ('wh','r'))
+	check('no prefix', n.compile('.+ing').literal_prefix == '' and n.compile('.+ing').required == ('ing',))
+	check('list prefix', n.compile([1,2,'.',3]).literal_prefix == (1,2))
+	check('auto head same result', n.match('wh.r..', words_search) == n.match('wh.r..', words_search, auto_head=False))
+	check('required pushdown', n.match('.+ich', words_search) == ['which.'] and words_search('', required=('ich',)) == ['w'])
+
+	print("\n>> counted repetition")
+	sizes = [ len(n.compile(f'x(ab|c){{1,{m}}}y').states) for m in (2, 50, 500) ]
+	check('size does not grow with m', sizes[0] == sizes[1] == sizes[2] and n.compile('x(ab|c){1,500}y').counted)
+	p = n.compile('a{1,3}')
+	a = next(iter(p.initial))
+	check('counts in the ids', a[1:] == (0,) and p.step(p.initial, 'a') == frozenset([(a[0], 1), p.nfa.end.id]))
+	check('not counted', not n.compile('ab*').counted and isi(n.compile('ab*').moves, tuple))
+	check('{n} is fixed', n.compile('[ab]{2}c').fixed.positions == (frozenset('ab'), frozenset('ab'), frozenset('c')) and n.compile('a{2,3}').fixed is None)
+	try :
+		n.compile('a{3,2}')
+		check('m < n raises', False)
+	except ValueError : check('m < n raises', True)
+	check('counted match', n.match('w.{3}', words_search) == n.match('w...', words_search))
+
+	print("\n>> eviction")
+	cache, Regex.cache = Regex.cache, LRU(maxsize=2)
+	for r in ['a', 'b', 'c', 'a'] : n.compile(r)
+	check('evictions counted', Regex.cache.stats() == {'hits': 0, 'misses': 4, 'evictions': 2, 'expirations': 0, 'size': 2, 'maxsize': 2})
+	Regex.cache = cache
+
+	check.summary()
+
+
+run()
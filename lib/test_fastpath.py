@@ -0,0 +1,42 @@
+from regex_nfa import *
+from seqs_store import *
+from functools import partial
+from bench_utils import gen_words
+from check_utils import Checks
+
+ws = words + gen_words(2000, seed=3, min_len=2, max_len=6)
+tests = [
+	['why', ws], ['wh..', ws], ['wh.r.', ws], ['w[hi]..', ws], ['[ab][cd].', ws], ['.h.', ws], ['...', ws], ['x', ws], ['wh[ae][nt]', ws],
+	[[1,'.',3], seqs], [[1,2,3,4], seqs], [['.','world'], sents], [['hi','.'], sents],
+]
+
+def run(tests) :
+	n = Regex()
+	check = Checks()
+
+	print("\n>> shapes")
+	check('literal', n.compile('why').fixed.kind == 'literal' and n.compile([1,2,3]).fixed.kind == 'literal')
+	check('mask', n.compile('wh.r..').fixed.kind == 'mask' and n.compile('wh.r..').fixed.literal == 'wh')
+	check('class', n.compile('w[hi]..').fixed.kind == 'class' and n.compile('w[hi]..').fixed.positions[1] == frozenset('hi'))
+	check('not fixed', all( n.compile(r).fixed is None for r in ['wh.+', 'a|b', 'ab?', 'a*', 'a{1,3}', '(ab|c)d'] ))
+
+	print("\n>> match_one fast == generic")
+	for i,(regex, data) in enumerate(tests) :
+		probe = data + [ s[:-1] for s in data if len(s) > 1 ] + [ s + s[-1:] for s in data ]
+		res = [ (n.match_one(regex, s), n.match_one(regex, s, fast=False)) for s in probe ]
+		check(f'{i}> {regex} >> {sum(a for a, _ in res)}', all(a == b for a, b in res))
+
+	print("\n>> match over a store (generic path) == match_one")
+	for i,(regex, data) in enumerate(tests) :
+		expected = [ s + '.' if isinstance(s, str) else list(s) + ['.'] for s in data if n.match_one(regex, s, fast=False) ]
+		res = n.match(regex, TrieStore(data)) or []
+		check(f'{i}> {regex} >> {res}', sorted(map(str, res)) == sorted(map(str, expected)))
+
+	print("\n>> match_many")
+	for regex in ['wh..', '[ab][cd].', 'x', 'w[hi]..'] :
+		check(f'match_many {regex}', list(n.match_many(regex, ws)) == list(n.match_many(regex, ws, fast=False)) == [ n.match_one(regex, w, fast=False) for w in ws ])
+
+	check.summary()
+
+
+run(tests)
@@ -1,6 +1,8 @@
 from regex_nfa import *
 from seqs_store import *
+from frontier import Cap, Beam, Budget
 from collections import defaultdict
+from check_utils import Checks
 
 null = lambda x : ['']
 
@@ -66,3 +68,135 @@ def run(tests, end='@') :
 
 
 run(tests)
+
+
+#Exact per-prefix matching and store calls : every prefix advances only through its own NFA states
+#  [regex, seqs, expected, store calls with the old global state/prefix sets]
+call_tests = [
+	['why', words, ['why'], 4], ['wh.+', words, ['why','who'], 8], ['whe.+', words, ['when'], 6],
+	['wh.r.', words, ['where'], 10], ['wh..', words, ['when','what','whom'], 18],
+	['w(h|o).', words, ['who','why'], 11], ['w(ha|or).', words, ['what','word','work'], 10],
+	['wh(o|y|e).+', words, ['whom','when'], 12],
+	['(ab|ba)', ['aa','ab','ba','bb'], ['ab','ba'], 7], ['a(bc|cb)d', ['abcd','acbd','abbd','accd','acdd'], ['abcd','acbd'], 12],
+	[[1,'.',3,'.'], seqs, [[1,2,3,4],[1,1,3,4]], 10], [[1,2,'(',3,'|',5,')','.'], seqs, [[1,2,3,4],[1,2,5,6],[1,2,5,7]], 9],
+	[['(','hi','|','hey',')','.'], sents, [['hi','hi'],['hi','world'],['hey','ho'],['hi','buddy']], 7],
+]
+
+def run_calls(tests, end='@') :
+	n = Regex()
+	check, before, after = Checks(), 0, 0
+	for i,(regex, data, expected, old_calls) in enumerate(tests) :
+		calls = 0
+		def store(prefix, head=None, end=end) :
+			nonlocal calls
+			calls += 1
+			return db_search(prefix, seqs=data, head=head, end=end)
+
+		m = [ r[:-1] for r in n.match(regex, store, end=end) ]
+		ok = sorted(map(str, m)) == sorted(map(str, expected)) and calls <= old_calls
+		msg = f'{i} calls:{old_calls}->{calls}> {regex} == {expected} {"" if ok else f" >> {m}"}'
+		check(msg, ok)
+		before, after = before + old_calls, after + calls
+
+	check.summary(f', STORE CALLS: {before} -> {after}')
+
+
+
+run_calls(call_tests)
+
+
+#iter_match : all the matches over all the steps, stopping early stops the lookups
+iter_tests = [
+	['wh.+', ['why','who','whom','when','what','whole','where','which','while','whammy']],
+	['w(h|o).{1,3}', ['why','who','whom','when','what','whole','where','which','while','woman','word','work']],
+	['x.+', []],
+]
+
+def run_iter(tests, end='@') :
+	n = Regex()
+	check = Checks()
+	for i,(regex, expected) in enumerate(tests) :
+		calls = 0
+		def store(prefix, head=None, end=end) :
+			nonlocal calls
+			calls += 1
+			return db_search(prefix, seqs=words, head=head, end=end)
+
+		m = [ r[:-1] for r in n.iter_match(regex, store, end=end) ]
+		all_calls, calls = calls, 0
+		first = next(n.iter_match(regex, store, end=end), None)
+		ok = sorted(m) == sorted(expected) and (first is None or calls < all_calls)
+		msg = f'{i} calls:{all_calls} first:{calls}> {regex} == {expected} {"" if ok else f" >> {m}"}'
+		check(msg, ok)
+
+	check.summary()
+
+
+
+run_iter(iter_tests)
+
+
+#frontier policies : deterministic caps, beam by store score, global budgets
+def run_policies() :
+	n = Regex()
+	store = TrieStore(words + ['whoa', 'whop', 'whom'])
+	check = Checks()
+
+	calls = 0
+	def counted(prefix, head=None, end='.') :
+		nonlocal calls
+		calls += 1
+		return store(prefix, head=head, end=end)
+
+	check('limit is deterministic (sorted)', n.match('w.+', store, limit=2) == n.match('w.+', TrieStore(reversed(words)), limit=2) == ['what.'])
+	check('cap', sorted(n.match('w.+', store, policy=Cap(3))) == ['what.', 'when.'])
+	check('beam by count', n.match('w.{2,3}', store, policy=Beam(1, store.count)) == ['who.'])
+	budget = Budget(max_calls=5)
+	n.match('w.+', counted, policy=budget)
+	check('budget calls', calls == 5 and budget.calls == 5)
+	budget = Budget(max_prefixes=4, policy=Cap(2))
+	n.match('w.+', match_prefixes_fun=store.search_many, policy=budget)
+	check('budget prefixes', budget.expanded == 4)
+	budget = Budget(max_calls=2)
+	check('budget exhausted', n.match('w.+', store, policy=budget) == [] and budget.exhausted and budget.truncated and budget.cut > 0)
+	budget = Budget(max_calls=100)
+	check('no match is not truncated', n.match('x.+', store, policy=budget) == [] and not budget.truncated)
+
+	check.summary()
+
+
+
+run_policies()
+
+#Symbol filters pushed down to the store : same results, fewer rows returned
+push_tests = [
+	['wh.r.', words], ['w(h|o).', words], ['(ab|ba)', ['aa','ab','ba','bb']], ['a(b|c)?', ['a','ab','ad','ac']],
+	[[1,'.',3,'.'], seqs], [['(','hi','|','hey',')','.'], sents],
+]
+
+def run_pushdown(tests) :
+	n = Regex()
+	check = Checks()
+
+	for i,(regex, data) in enumerate(tests) :
+		store = TrieStore(data)
+		rows = { True: 0, False: 0 }
+		def pushed(prefix, head=None, end='.', allowed=None) :
+			res = db_search(prefix, data, head=head, end=end, allowed=allowed)
+			rows[True] += len(res)
+			return res
+		def plain(prefix, head=None, end='.') :
+			res = db_search(prefix, data, head=head, end=end)
+			rows[False] += len(res)
+			return res
+		expected = sorted(map(str, n.match(regex, plain)))
+		res = [ n.match(regex, pushed), n.match(regex, store), n.match(regex, match_prefixes_fun=store.search_many),
+			n.match(regex, match_prefixes_fun=partial(db_search_many, seqs=data)) ]
+		ok = all(sorted(map(str, r)) == expected for r in res) and rows[True] < rows[False]
+		ok = ok and sorted(map(str, n.iter_match(regex, store))) == sorted(map(str, n.iter_match(regex, plain)))
+		check(f'{i} rows:{rows[False]}->{rows[True]}> {regex} == {expected}', ok)
+
+	check.summary()
+
+
+run_pushdown(push_tests)
@@ -0,0 +1,45 @@
+import pickle
+from regex_nfa import *
+from seqs_store import *
+from check_utils import Checks
+
+tests = [
+	[['wh.r.', 'wh..', 'w(h|o).', 'why', 'x.+', 'wh.+', 'wo.+', 'a.c'], words + ['abc']],
+	[['(ab|ba)', 'a.', '.b', 'bb?'], ['aa','ab','ba','bb','b']],
+	[[[1,'.',3,'.'], [1,2,'.','+'], [1,1,'.','+'], [2,'.']], seqs],
+	[[['(','hi','|','hey',')','.'], ['hi','.'], ['.','world']], sents],
+]
+
+def run(tests) :
+	n = Regex()
+	check = Checks()
+
+	print("\n>> same results as match() per pattern")
+	for i,(patterns, data) in enumerate(tests) :
+		store = TrieStore(data)
+		calls = { 'multi': 0, 'single': 0 }
+		def counted(key) :
+			def search(prefix, head=None, end='.', allowed=None) :
+				calls[key] += 1
+				return store(prefix, head=head, end=end, allowed=allowed)
+			return search
+		expected = [ sorted(map(str, n.match(p, counted('single')) or [])) for p in patterns ]
+		res = n.match_multi(patterns, counted('multi'))
+		res_many = n.match_multi(patterns, match_prefixes_fun=store.search_many)
+		ok = [ sorted(map(str, r)) for r in res ] == expected == [ sorted(map(str, r)) for r in res_many ]
+		check(f'{i} calls:{calls["single"]}->{calls["multi"]}> {res}', ok and calls['multi'] < calls['single'])
+
+	print("\n>> multi pattern")
+	mp = n.compile_multi(['wh.r.', 'wh..'])
+	check('cached', n.compile_multi(['wh.r.', 'wh..']) is mp and n.compile_multi(mp) is mp)
+	check('common literal prefix', mp.literal_prefix == 'wh' and n.compile_multi(['why', 'abc']).literal_prefix == '')
+	check('tags', sorted(mp.ends(mp.step(mp.step(mp.step(mp.step(mp.initial, 'w'), 'h'), 'e'), 'n'))) == [1])
+	check('pickle', pickle.loads(pickle.dumps(mp)).patterns[0].key == 'wh.r.')
+	res, trace = n.match_multi(['wh.r.', 'wh..'], TrieStore(words), trace=True)
+	check('trace', res == [['where.'], n.match('wh..', TrieStore(words))] and trace.totals()['full'] == 4)
+	check('single pattern', n.match_multi(['wh.+'], TrieStore(words)) == [n.match('wh.+', TrieStore(words))])
+
+	check.summary()
+
+
+run(tests)
@@ -25,9 +25,16 @@ tests = [
 	['(a|b)*', ''], ['(a|b)*', 'a'], ['(a|b)*', 'b'], ['(a|b)*', 'aa'], ['(a|b)*', 'bb'],['(a|b)*', 'ab'],['(a|b)*', 'ba'],
 	['(a|b)+', '',False], ['(a|b)+', 'a'], ['(a|b)+', 'b'], ['(a|b)+', 'aa'], ['(a|b)+', 'bb'],['(a|b)+', 'ab'],['(a|b)+', 'ba'],
 
-#	['compound range'],
-#	['(a|b){0,2}',''], ['(a|b){0,2}', 'a'], ['(a|b){0,2}', 'b'], ['(a|b){0,2}', 'aa'], ['(a|b){0,2}', 'bb'],
-#	['(a|b){0,2}','ab'], ['(a|b){0,2}', 'ba'], ['(a|b){0,2}', 'aaa',False], ['(a|b){0,2}', 'bbb',False],
+	['compound range'],
+	['(a|b){0,2}',''], ['(a|b){0,2}', 'a'], ['(a|b){0,2}', 'b'], ['(a|b){0,2}', 'aa'], ['(a|b){0,2}', 'bb'],
+	['(a|b){0,2}','ab'], ['(a|b){0,2}', 'ba'], ['(a|b){0,2}', 'aaa',False], ['(a|b){0,2}', 'bbb',False],
+	['(ab){2,3}', 'ab',False], ['(ab){2,3}', 'abab'], ['(ab){2,3}', 'ababab'], ['(ab){2,3}', 'abababab',False],
+	['[xy]{3}', 'xyx'], ['[xy]{3}', 'xy',False], ['[xy]{3}', 'xyxy',False],
+	['a{2,}', 'a',False], ['a{2,}', 'aa'], ['a{2,}', 'a' * 20],
+	['a{1,3}b', 'ab'], ['a{1,3}b', 'aab'], ['a{1,3}b', 'aaab'], ['a{1,3}b', 'aaaab',False], ['a{1,3}b', 'b',False],
+	['x(a|ab){1,3}y', 'xababy'], ['x(a|ab){1,3}y', 'xaaby'], ['x(a|ab){1,3}y', 'xaaaay',False],
+	['((ab){2}c){2}', 'ababcababc'], ['((ab){2}c){2}', 'ababcabc',False], ['(a?){2,3}b', 'b'],
+	[[1,'{1,500}',5], [1] * 500 + [5]], [[1,'{1,500}',5], [1] * 501 + [5],False], [[1,'{1,500}',5], [5],False],
 
 	['character classes'],
 	['[abc]', '', False], ['[abc]', 'a'], ['[abc]', 'b'], ['[abc]', 'c'],
@@ -53,13 +60,16 @@ tests = [
 	['a*b+', 'b'], ['a*b+', 'ab'],['a*b+', 'aab'], ['a*b+', 'aabb'], ['a*b+', 'aa', False],
 	['a{0,2}b+', 'aab'], ['a{0,1}b+', 'ab'], ['a{0,1}b+', 'abb'], ['a{0,1}b+', 'abbb'],
 
+	['deep epsilon chains, deeper than the recursion limit'],
+	['a?' * 800 + 'b', 'b'], ['a?' * 800 + 'b', 'a' * 800 + 'b'], ['a?' * 800 + 'b', 'a' * 801 + 'b', False],
+
 ]
 
 
 def check(res) : 
 	return res
 
-def run(tests) :
+def run(tests, dfa=False, vector=False) :
 	n = Regex()
 	passed, failed = 0,0
 	for i,t in enumerate(tests) :
@@ -67,7 +77,10 @@ def run(tests) :
 		if len(t) == 1 :
 			print("\n>> " + t[0])
 			continue
-		res = check( n.match_one(t[0], t[1]) )
+		if vector : 
+			seq = n.lst_str2lst(t[1]) if n.is_lst_str(t[1]) else t[1]
+			res = check( bool(n.match_many(t[0], [seq])[0]) )
+		else : res = check( n.match_one(t[0], t[1], dfa=dfa) )
 
 		expected  = t[2] if len(t) > 2 else True
 		sign = '==' if expected else '!='
@@ -84,3 +97,7 @@ def run(tests) :
 
 
 run(tests)
+print('\n>> same cases, lazy DFA')
+run(tests, dfa=True)
+print('\n>> same cases, vectorized match_many')
+run(tests, vector=True)
@@ -0,0 +1,50 @@
+import pickle
+import tempfile
+from regex_nfa import *
+from seqs_store import *
+from mmap_store import MmapCorpus, np
+from parallel import match_sharded
+from check_utils import Checks
+
+tests = [
+	['wh.r.', words], ['wh..', words], ['w(h|o).', words], ['x.+', words], ['(ab|ba)', ['aa','ab','ba','bb']],
+	['a(b|c)?', ['a','ab','ad','ac']], [[1,'.',3,'.'], seqs], [[1,2,'.','+'], seqs],
+	[['(','hi','|','hey',')','.'], sents], [['hi','.'], sents],
+]
+
+def run(tests) :
+	n = Regex()
+	check = Checks()
+
+	with tempfile.TemporaryDirectory() as d :
+		print("\n>> same results as TrieStore")
+		for i,(regex, data) in enumerate(tests) :
+			trie = TrieStore(data)
+			expected = sorted(map(str, n.match(regex, trie)))
+			mm = MmapCorpus.build(data, f'{d}/{i}')
+			res = n.match(regex, mm)
+			res_many = n.match(regex, match_prefixes_fun=mm.search_many)
+			check(f'{i}> {regex} >> {res}', sorted(map(str, res)) == expected == sorted(map(str, res_many)))
+
+		print("\n>> corpus")
+		mm = MmapCorpus.build(words + ['who', 'whom'], f'{d}/words')
+		trie = TrieStore(words)
+		check('size skips duplicates', len(mm) == len(trie) and sorted(mm.row(i) for i in range(len(mm))) == sorted(words))
+		check('count', all(mm.count(p) == trie.count(p) for p in ['', 'w', 'wh', 'who', 'whom', 'x', 'whx']))
+		check('children', all(sorted(mm.children(p)) == sorted(trie.children(p)) for p in ['', 'w', 'wh', 'who', 'whom', 'x']))
+		check('allowed', mm.children('who', allowed={'m', '.', 'x'}) == trie.children('who', allowed={'m', '.', 'x'}) == ['.', 'm'])
+		check('head', sorted(n.match('h..', mm, head='w')) == sorted(n.match('h..', trie, head='w')))
+		check('reopen is mapped', isi(MmapCorpus(f'{d}/words').data, np.memmap))
+		copy = pickle.loads(pickle.dumps(mm))
+		check('pickle re-opens', copy.path == mm.path and copy.search('wh') == mm.search('wh'))
+		shards = [ MmapCorpus.build(words[k::2], f'{d}/shard{k}') for k in range(2) ]
+		res, _ = match_sharded('wh.+', shards, processes=2)
+		check('shared by workers', sorted(res) == sorted(n.match('wh.+', trie)))
+		mixed = [[], [1,'x'], [1,2], ['hi',3]]
+		mm = MmapCorpus.build(mixed, f'{d}/mixed')
+		check('mixed symbols, empty first', mm.kind == 'int' and len(mm) == 4 and sorted(mm.search((1,)), key=str) == sorted(TrieStore(mixed).search((1,)), key=str))
+
+	check.summary()
+
+
+run(tests)
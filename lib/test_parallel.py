@@ -0,0 +1,38 @@
+from parallel import *
+from seqs_store import *
+from check_utils import Checks
+
+def shard(data, n) : return [ data[i::n] for i in range(n) ]
+
+tests = [
+	# regex, seqs, shards, limit
+	['wh..', words, 3, None], ['w(h|o).', words, 2, None], ['wh.+', words, 4, None], ['x.+', words, 2, None],
+	[[1,'.',3,'.'], seqs, 3, None], [['(','hi','|','hey',')','.'], sents, 2, None],
+	['wh..', words, 3, 2], ['wh.+', words, 2, 3], [[1,'.','.'], seqs, 2, 1],
+]
+
+def run(tests, processes=2) :
+	n = Regex()
+	check = Checks()
+	for i,(regex, data, nshards, limit) in enumerate(tests) :
+		parts = shard(data, nshards)
+		res, stats = match_sharded(regex, [ partial(db_search, seqs=p) for p in parts ], limit=limit, processes=processes)
+		if limit is None :
+			expected = n.match(regex, partial(db_search, seqs=data))
+			ok = sorted(map(str, res)) == sorted(map(str, expected))
+		else : #global limit : after the first step never more lookups in total than the limit per step
+			calls = sum(s['calls'] for s in stats['shards'])
+			ok = res is not None and calls <= nshards + limit * (stats['steps'] - 1)
+			#the kept results are matches in the whole store, of any length : the capped frontier may reach longer ones first
+			every = n.iter_match(regex, partial(db_search, seqs=data))
+			ok = ok and len(res) <= limit and set(map(str, res)) <= set(map(str, every))
+		#same through a factory
+		res2, _ = match_sharded(regex, parts, factory=lambda p : partial(db_search, seqs=p), limit=limit, processes=0)
+		ok = ok and sorted(map(str, res)) == sorted(map(str, res2)) and len(stats['shards']) == nshards
+		check(f'{i}> {regex} shards:{nshards} limit:{limit} >> {res}', ok)
+
+	check.summary()
+
+
+if __name__ == '__main__' :
+	run(tests)
@@ -0,0 +1,60 @@
+import asyncio
+from regex_nfa import *
+from seqs_store import *
+from check_utils import Checks
+
+ws = words + ['something', 'thing', 'cares', 'hires', 'abd', 'bacccd']
+tests = [
+	['.+ing', ws], ['..r.s', ws], ['wh.r.', ws], ['w.+', ws], ['.+o', ws], ['(ab|ba)c*d', ws], ['.?h(e|i)..', ws],
+	[[1,'.','+',4], seqs], [['.','world'], sents], [['(','hi','|','hey',')','.'], sents],
+]
+
+def run(tests) :
+	n = Regex()
+	check = Checks()
+
+	print("\n>> backward == forward")
+	for i,(regex, data) in enumerate(tests) :
+		fwd, bwd = TrieStore(data), SuffixStore(data)
+		expected = sorted(map(str, n.match(regex, fwd, max_steps=12) or []))
+		res = [ n.match(regex, match_suffix_fun=bwd, max_steps=12), n.match(regex, fwd, match_suffix_fun=bwd, max_steps=12),
+			n.match(regex, match_suffixes_fun=bwd.search_many, max_steps=12) ]
+		check(f'{i}> {regex} >> {res[0]}', all(sorted(map(str, r or [])) == expected for r in res))
+
+	print("\n>> reversed pattern and direction")
+	check('reverse postfix', n.reverse_postfix(n.compile('(ab|ba)c*d').postfix) == ['d', 'c', '*', 'b', 'a', '#', 'a', 'b', '#', '|', '#', '#'])
+	check('cached', n.compile_reversed('.+ing') is n.compile_reversed('.+ing') and n.compile_reversed('.+ing').literal_prefix == 'gni')
+	check('list reversed', n.compile_reversed([1,'.','+',4]).literal_prefix == (4,))
+	check('auto', n.backward(n.compile('..r.s'), n.compile_reversed('..r.s')) and not n.backward(n.compile('wh.r.'), n.compile_reversed('wh.r.')))
+	calls = { 'fwd': 0, 'bwd': 0 }
+	def counted(key, store) :
+		def search(prefix, head=None, end='.', allowed=None) :
+			calls[key] += 1
+			return store(prefix, head=head, end=end, allowed=allowed)
+		return search
+	res = n.match('.+ing', counted('fwd', TrieStore(ws)), match_suffix_fun=counted('bwd', SuffixStore(ws)), max_steps=12)
+	check('auto uses the suffix store', res == ['thing.'] and calls['fwd'] == 0 and calls['bwd'] > 0)
+	res = n.match('.+ing', counted('fwd', TrieStore(ws)), match_suffix_fun=counted('bwd', SuffixStore(ws)), max_steps=12, direction='forward')
+	check('forced forward', res == ['thing.'] and calls['fwd'] > 0)
+	check('head is forward', n.match('r.', TrieStore(ws), head='whe', match_suffix_fun=SuffixStore(ws)) == ['where.'])
+	try :
+		n.match('.+ing', TrieStore(ws), direction='backward')
+		check('backward without suffix store raises', False)
+	except ValueError : check('backward without suffix store raises', True)
+	res, trace = n.match('.+ing', match_suffix_fun=SuffixStore(ws), max_steps=12, trace=True)
+	check('trace', res == ['thing.'] and trace.totals()['full'] == 1)
+	check('suffix store', SuffixStore(['abc']).search('c') == ['cb'] and SuffixStore([[1,2]]).search([2]) == [[2,1]])
+
+	print("\n>> other match variants")
+	fwd, bwd = TrieStore(ws), SuffixStore(ws)
+	check('iter_match', sorted(n.iter_match('.+ing', match_suffix_fun=bwd, max_steps=12)) == sorted(n.iter_match('.+ing', fwd, max_steps=12)))
+	res = asyncio.run(n.amatch('..r.s', match_suffix_afun=AsyncStore(bwd)))
+	check('amatch', sorted(res) == sorted(n.match('..r.s', fwd)))
+	res = n.match_multi(['.+ing', '..r.s'], match_suffix_fun=bwd, max_steps=12)
+	check('match_multi', [ sorted(r) for r in res ] == [ sorted(r) for r in n.match_multi(['.+ing', '..r.s'], fwd, max_steps=12) ])
+	check('multi reversed', n.compile_reversed(n.compile_multi(['.+ing', 'wh.'])).patterns[0] is n.compile_reversed('.+ing'))
+
+	check.summary()
+
+
+run(tests)
@@ -0,0 +1,95 @@
+import asyncio
+from regex_nfa import *
+from seqs_store import *
+from spill import SpillFrontier
+import os
+import pickle
+import tempfile
+from bench_utils import gen_words
+from check_utils import Checks
+
+big = gen_words(3000, seed=7)
+tests = [
+	['wh.+', words], ['.+', words], ['..r.s', words + ['cares', 'hires']], ['.+', big], ['.a.+', big], ['(b|c).?.?', big],
+	[[1,'.','+',4], seqs], [['.','world'], sents],
+]
+
+def run(tests) :
+	n = Regex()
+	check = Checks()
+
+	tmp = tempfile.mkdtemp()
+
+	print("\n>> spilled == in-memory")
+	for i,(regex, data) in enumerate(tests) :
+		store = TrieStore(data)
+		expected = n.match(regex, store, max_steps=15)
+		res = [ n.match(regex, store, max_steps=15, max_frontier_bytes=2000, chunk=50, spill_dir=tmp),
+			n.match(regex, match_prefixes_fun=store.search_many, max_steps=15, max_frontier_bytes=2000, chunk=7, spill_dir=tmp),
+			n.match(regex, store, max_steps=15, max_frontier_bytes=10**9) ]
+		check(f'{i}> {regex} >> {len(expected or [])}', all(sorted(map(str, r or [])) == sorted(map(str, expected or [])) for r in res))
+	check('temp files removed', os.listdir(tmp) == [])
+
+	print("\n>> frontier")
+	f = SpillFrontier(max_bytes=1000, chunk=4, dir=tmp)
+	ids = frozenset([1, 2])
+	for w in big[:100] : f.add(w, ids)
+	check('spilled', len(f) == 100 and f.spilled > 0 and len(os.listdir(tmp)) > 0 and f.peak <= 1000 + 200)
+	check('state-sets interned', len(f.set_list) == 1)
+	parts = list(f.chunks())
+	check('chunks', max(map(len, parts)) <= 4 and sorted(w for p in parts for w in p) == sorted(big[:100]))
+	check('chunk values', all(v is ids for p in parts for v in p.values()))
+	f = SpillFrontier(max_bytes=10**9, dir=tmp)
+	for w in ['where', 'what', 'wharf', 'x'] : f.add(w, ids)
+	f.spill()
+	with open(f.files[0], 'rb') as fh : coded = pickle.load(fh)
+	check('front-coded', coded == [(0, 'wharf', 0), (3, 't', 0), (2, 'ere', 0), (0, 'x', 0)])
+	check('front-coded round trip', sorted( p for part in f.chunks() for p in part ) == ['wharf', 'what', 'where', 'x'])
+	f = SpillFrontier(max_bytes=10**9, dir=tmp)
+	for p in [(1, 'a'), (1.0, 'b'), (1, 'a', 2)] : f.add(p, ids)
+	f.spill()
+	back = [ p for part in f.chunks() for p in part ]
+	check('mixed symbols round trip', sorted(map(repr, back)) == ["(1, 'a')", "(1, 'a', 2)", "(1.0, 'b')"])
+	check('consumed', os.listdir(tmp) == [] and f.bytes == 0)
+	f = SpillFrontier(max_bytes=500, dir=tmp)
+	f.update({ w : ids for w in big[:50] })
+	f.close()
+	check('close', os.listdir(tmp) == [])
+
+	print("\n>> stats")
+	res, trace = n.match('.+', TrieStore(big), max_steps=15, max_frontier_bytes=5000, chunk=100, spill_dir=tmp, trace=True)
+	tot = trace.totals()
+	check('peak frontier bytes', 0 < tot['max_frontier_bytes'] <= 2 * (5000 + 200))
+	check('spilled entries', tot['spilled'] > 0)
+	check('counts', tot['full'] == len(res) and trace.steps[0]['selected'] == 1 and trace.steps[1]['states'] > 0)
+	res, trace = n.match('.+', TrieStore(big), max_steps=15, max_frontier_bytes=10**9, trace=True)
+	check('no spill', trace.totals()['spilled'] == 0 and trace.totals()['max_frontier_bytes'] > 5000)
+	res = n.match('.a.+', TrieStore(big), max_steps=15)
+	check('iter_match', sorted(n.iter_match('.a.+', TrieStore(big), max_steps=15, max_frontier_bytes=2000, chunk=50, spill_dir=tmp)) ==
+		sorted(n.iter_match('.a.+', TrieStore(big), max_steps=15)))
+	check('amatch', sorted(asyncio.run(n.amatch('.a.+', AsyncStore(TrieStore(big)), max_steps=15, max_frontier_bytes=2000, chunk=50, spill_dir=tmp))) == sorted(res))
+	check('match_multi', [ sorted(r) for r in n.match_multi(['.a.+', 'b.+'], TrieStore(big), max_steps=15, max_frontier_bytes=2000, spill_dir=tmp) ] ==
+		[ sorted(r) for r in n.match_multi(['.a.+', 'b.+'], TrieStore(big), max_steps=15) ])
+	check('temp files removed', os.listdir(tmp) == [])
+	try :
+		n.match('wh.+', TrieStore(words), limit=1, max_frontier_bytes=10**9)
+		check('limit with spill raises', False)
+	except ValueError : check('limit with spill raises', True)
+	calls = [0]
+	def failing(prefix, head=None, end='.') :
+		calls[0] += 1
+		if calls[0] > 200 : raise IOError('store down')
+		return db_search(prefix, head=head, end=end, seqs=big)
+	try :
+		n.match('.+', failing, max_steps=15, max_frontier_bytes=2000, chunk=50, spill_dir=tmp)
+		check('failing store', False)
+	except IOError : check('failing store leaves no temp files', os.listdir(tmp) == [])
+	res = n.iter_match('.+', TrieStore(big), max_steps=15, max_frontier_bytes=2000, chunk=50, spill_dir=tmp)
+	next(res), next(res)
+	res.close()
+	check('stopped iter_match leaves no temp files', os.listdir(tmp) == [])
+
+	check.summary()
+
+
+run(tests)
@@ -0,0 +1,75 @@
+import os
+import pickle
+import tempfile
+from regex_nfa import *
+from seqs_store import *
+from sqlite_store import SQLiteStore
+from check_utils import Checks
+
+tests = [
+	['wh.r.', words], ['wh..', words], ['w(h|o).', words], ['x.+', words], ['(ab|ba)', ['aa','ab','ba','bb']],
+	[[1,'.',3,'.'], seqs], [[1,2,'.','+'], seqs], [['(','hi','|','hey',')','.'], sents], [['hi','.'], sents],
+]
+
+def run(tests) :
+	n = Regex()
+	check = Checks()
+
+	print("\n>> same results as TrieStore")
+	for i,(regex, data) in enumerate(tests) :
+		expected = sorted(map(str, n.match(regex, TrieStore(data))))
+		store = SQLiteStore().load(data)
+		res = n.match(regex, store)
+		res_many = n.match(regex, match_prefixes_fun=store.search_many)
+		check(f'{i}> {regex} >> {res}', sorted(map(str, res)) == expected == sorted(map(str, res_many)))
+
+	print("\n>> store")
+	store = SQLiteStore().load(words + ['who', 'whom'])
+	trie = TrieStore(words)
+	check('size skips duplicates', len(store) == len(trie))
+	check('count', all(store.count(p) == trie.count(p) for p in ['', 'w', 'wh', 'who', 'whom', 'x']))
+	check('head', sorted(n.match('h..', store, head='w')) == sorted(n.match('h..', trie, head='w')))
+	ws = SQLiteStore().load(sents)
+	check('list prefix', ws.kind == 'word' and ws.search(['hi'], end='@') == [ list(r) for r in ws.search(('hi',), end='@') ])
+	res = store.search_many([ w[:2] for w in words ] * 100)
+	check('batches', [ sorted(r) for r in res ] == [ sorted(trie.search(w[:2])) for w in words ] * 100)
+
+	print("\n>> allowed pushdown")
+	queries = store.queries
+	check('allowed', sorted(store.search('wh', allowed={'o', 'i', 'x'})) == ['whi', 'who'] and store('who', allowed={'.', 'm'}) == ['who.', 'whom'])
+	check('none allowed, no query', store('wh', allowed={1}) == [] and store.queries == queries + 2)
+	int_store = SQLiteStore().load(seqs)
+	check('int symbols', sorted(int_store.search((1,2), allowed={3, '3', '.'})) == [(1,2,3)])
+	allowed = [ {'o', 'e'}, None, {'.'}, {'m', '.'}, set() ] * 100
+	prefixes = ['wh', 'wh', 'who', 'who', 'wh'] * 100
+	res = store.search_many(prefixes, allowed=allowed)
+	check('batched allowed', [ sorted(r) for r in res ] == [ sorted(trie.search(p, allowed=a)) for p, a in zip(prefixes, allowed) ])
+	queries = store.queries
+	store.search_many(['wh'] * 1000, allowed=[{'o'}] * 1000)
+	check('batched allowed pairs', store.queries == queries + 1)
+
+	with tempfile.TemporaryDirectory() as d :
+		path = os.path.join(d, 'seqs.db')
+		SQLiteStore(path).load(seqs[:3]).load(seqs[3:]).close()
+		store = SQLiteStore(path)
+		check('reopen file', store.kind == 'int' and len(store) == len(seqs) and n.match([1,2,'.','+'], store) == n.match([1,2,'.','+'], TrieStore(seqs)))
+		copy = pickle.loads(pickle.dumps(store))
+		check('pickle', copy.path == path and copy.search([1,2]) == store.search([1,2]))
+		store.close(); copy.close()
+
+	print("\n>> load and processes")
+	store = SQLiteStore().load([[], [1,2]])
+	check('kind from the first non-empty', store.kind == 'int' and len(store) == 2 and sorted(store.search(()), key=str) == [('.',), (1,)])
+	store = SQLiteStore().load(words).load(words + ['whoa'])
+	check('duplicates across loads', len(store) == len(words) + 1 and store.count('wh') == TrieStore(words + ['whoa']).count('wh'))
+	try :
+		pickle.dumps(store)
+		check('in-memory pickle raises', False)
+	except TypeError : check('in-memory pickle raises', True)
+	store.pool.pid = -1 # as in a forked child
+	check('pool reset in another process', store.search('wh', end='@') and store.pool.pid == os.getpid() and store.pool.opened == 1)
+
+	check.summary()
+
+
+run(tests)
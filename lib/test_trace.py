@@ -0,0 +1,47 @@
+import asyncio
+from regex_nfa import *
+from seqs_store import *
+from check_utils import Checks
+
+def run() :
+	n = Regex()
+	store = TrieStore(words)
+	check = Checks()
+
+	print("\n>> match trace")
+	res, trace = n.match('wh.r.', store, trace=True)
+	st = trace.steps
+	check('same results', res == n.match('wh.r.', store))
+	check('trace off', n.match('wh.r.', store, trace=False) == n.match('wh.r.', store, trace=0) == res)
+	mine = Trace()
+	check('trace filled in place', n.match('wh.r.', store, trace=mine) == (res, mine) and len(mine.steps) == 4)
+	check('steps', [ s['step'] for s in st ] == [0, 1, 2, 3] and trace.totals()['steps'] == 4)
+	check('calls per prefix', [ s['calls'] for s in st ] == [ s['selected'] for s in st ] == [1, 5, 1, 1])
+	plain = lambda prefix, head=None, end='.' : store(prefix, head=head, end=end)
+	_, tr = n.match('wh.r.', plain, trace=True)
+	check('rows vs kept', [ (s['rows'], s['kept']) for s in tr.steps ] == [(5, 5), (10, 1), (1, 1), (1, 1)] and st[1]['rows'] == 1)
+	check('full', st[-1]['full'] == 1 and trace.totals()['full'] == 1)
+	check('times', all(s['store_time'] >= 0 and s['filter_time'] >= 0 and s['latency'] <= s['store_time'] + 1e-6 for s in st))
+
+	print("\n>> callback, batched, policy")
+	got = []
+	res, trace = n.match('w.+', match_prefixes_fun=store.search_many, policy=Cap(3), trace=got.append)
+	check('callback per step', got == trace.steps and len(got) > 0)
+	check('one call per batch', all(s['calls'] == 1 for s in got))
+	check('frontier before/after policy', any(s['prefixes'] > s['selected'] == 3 for s in got))
+	check('states', all(1 <= s['state_sets'] <= s['states'] for s in got))
+	tr = Trace()
+	check('pushdown kept', n.match('w(h|o).', store, trace=tr)[0] == n.match('w(h|o).', store) and tr.steps[1]['rows'] == tr.steps[1]['kept'])
+
+	print("\n>> iter_match, amatch")
+	tr = Trace()
+	res = list(n.iter_match('wh.+', store, trace=tr))
+	check('iter_match', sorted(res) == sorted(n.iter_match('wh.+', store)) and tr.totals()['full'] == len(res))
+	res, tr = asyncio.run(n.amatch('wh.r.', AsyncStore(store), trace=True))
+	check('amatch', res == ['where.'] and [ s['calls'] for s in tr.steps ] == [1, 5, 1, 1])
+	check('off by default', n.match('wh.r.', store) == ['where.'])
+
+	check.summary()
+
+
+run()
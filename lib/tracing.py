@@ -0,0 +1,66 @@
+# Per-step instrumentation of Regex.match()/iter_match()/amatch()
+#  pass trace=Trace() (or trace=True, or a callback) to fill it, with no trace nothing is measured
+#    res, trace = n.match('wh.+', store, trace=True)
+#    trace.steps[0] : {'step': 0, 'prefixes': 1, 'selected': 1, 'state_sets': 1, 'states': 3, 'calls': 1,
+#                      'latency': ..., 'rows': 5, 'kept': 5, 'full': 0, 'select_time': ..., 'store_time': ..., 'filter_time': ...}
+#  prefixes/selected : frontier size before/after the policy, state_sets/states : distinct NFA state-sets/states in it
+#  calls/latency : store calls and the sum of their durations (> store_time when amatch() overlaps them)
+#  rows/kept/full : sequences returned by the store, the ones kept (next frontier + full), the full ones
+#  *_time : wall time of selecting the frontier, the store lookups and filter_sas()
+#  with match(max_frontier_bytes=...) also frontier_bytes : peak estimated bytes of the in-memory frontiers
+#  and spilled : entries of the next frontier written to disk (see spill.py)
+import time
+
+class Trace(object):
+
+	def __init__(self, callback=None):
+		self.callback = callback # callback(step dict) after every step, e.g. to push to a metrics system
+		self.steps = []
+		self.compile_time = 0.0
+		self.cur = { 'calls': 0, 'latency': 0.0 }
+
+	#store function counting its calls and their duration into the current step
+	def timed(self, fun):
+		if fun is None : return None
+		def call(*args, **kw):
+			t0 = time.perf_counter()
+			try : return fun(*args, **kw)
+			finally :
+				self.cur['calls'] += 1
+				self.cur['latency'] += time.perf_counter() - t0
+		return call
+
+	def atimed(self, afun):
+		if afun is None : return None
+		async def call(*args, **kw):
+			t0 = time.perf_counter()
+			try : return await afun(*args, **kw)
+			finally :
+				self.cur['calls'] += 1
+				self.cur['latency'] += time.perf_counter() - t0
+		return call
+
+	#sets : the distinct state-sets of the selected prefixes, extra : more stats of the step
+	def record(self, step, prefixes, selected, sets, rows, kept, full, select_time, store_time, filter_time, **extra):
+		st, self.cur = self.cur, { 'calls': 0, 'latency': 0.0 }
+		ids, n = set(), 0
+		for states in sets :
+			ids.update(states)
+			n += 1
+		st.update(step=step, prefixes=prefixes, selected=selected, state_sets=n, states=len(ids),
+			rows=rows, kept=kept, full=full, select_time=select_time, store_time=store_time, filter_time=filter_time)
+		st.update(extra)
+		self.steps.append(st)
+		if self.callback is not None : self.callback(st)
+
+	#sums over the steps, the frontier sizes as maximums
+	def totals(self):
+		tot = { 'steps': len(self.steps), 'compile_time': self.compile_time }
+		for st in self.steps :
+			for k, v in st.items() :
+				if k == 'step' : continue
+				if k in ('prefixes', 'selected', 'state_sets', 'states', 'frontier_bytes') : tot['max_' + k] = max(tot.get('max_' + k, 0), v)
+				else : tot[k] = tot.get(k, 0) + v
+		return tot
+
+	def __repr__(self): return f'Trace({self.totals()})'
@@ -0,0 +1,100 @@
+# Bulk matching of in-memory sequences with NumPy :
+#  the sequences are encoded once into a padded symbol-id matrix (Corpus),
+#  the Pattern DFA is expanded to a transition table over symbol classes and
+#  advanced one column at a time across all the rows
+try :
+	import numpy as np
+except ImportError : # optional dependency, only needed for match_many
+	np = None
+
+isi = isinstance
+
+PAD = 0 #symbol-id/class of the padding after the end of a sequence
+OTHER = 1 #class of the symbols the pattern does not mention, only ANY matches them
+
+class _Other(object):
+	def __repr__(self): return 'OTHER'
+
+other_sym = _Other() #stand-in symbol for the OTHER class when building the table
+
+
+# Padded integer matrix of symbol ids (column-major, so column steps are contiguous) + lengths
+#  symbol ids start from 1, 0 is padding. Works with strings, int or word sequences
+class Corpus(object):
+
+	def __init__(self, seqs, syms=None, dtype='int32'):
+		if np is None : raise ImportError('Corpus/match_many requires numpy')
+		self.seqs = seqs
+		self.syms = {} if syms is None else syms # symbol => id
+		n = len(seqs)
+		self.lengths = np.fromiter((len(s) for s in seqs), dtype=np.int64, count=n)
+		self.width = int(self.lengths.max()) if n > 0 else 0
+		get = self.syms.get
+		flat = []
+		for seq in seqs :
+			for sym in seq :
+				sid = get(sym)
+				if sid is None : sid = self.syms[sym] = len(self.syms) + 1
+				flat.append(sid)
+		rows = np.repeat(np.arange(n), self.lengths)
+		offsets = np.cumsum(self.lengths) - self.lengths
+		cols = np.arange(len(flat)) - np.repeat(offsets, self.lengths)
+		self.matrix = np.zeros((n, self.width), dtype=dtype, order='F')
+		self.matrix[rows, cols] = flat
+
+	def __len__(self): return len(self.lengths)
+
+
+# Full DFA transition table of the pattern restricted to the corpus symbols
+#  classes : PAD(identity), OTHER, one per pattern symbol present in the corpus
+#  returns (table, accept, sym2cls, start, dead) or None if the lazy DFA blew up
+def dfa_table(pattern, syms):
+	dfa = pattern.dfa()
+	alphabet = [ s for s in pattern.symbols if s in syms ]
+	sym2cls = np.full(len(syms) + 1, OTHER, dtype=np.int32)
+	sym2cls[PAD] = PAD
+	for k, s in enumerate(alphabet) : sym2cls[syms[s]] = k + 2
+	reps = [ None, other_sym ] + alphabet # a representative symbol per class
+
+	index, order = { dfa.start : 0 }, [ dfa.start ] # DFA state => table row
+	rows = []
+	while len(rows) < len(order) :
+		d = order[len(rows)]
+		row = [ len(rows) ]
+		for sym in reps[1:] :
+			nd = dfa.next(d, sym)
+			if nd is None : return None
+			if nd not in index :
+				index[nd] = len(order)
+				order.append(nd)
+			row.append(index[nd])
+		rows.append(row)
+
+	table = np.array(rows, dtype=np.int32)
+	accept = np.array([ dfa.accept[d] for d in order ], dtype=bool)
+	dead = index.get(dfa.dead, -1)
+	return table, accept, sym2cls, 0, dead
+
+#literal/mask/class patterns (Pattern.fixed) : rows of the pattern length with an allowed symbol id
+#  in every non-ANY column, no DFA table
+def match_fixed(fixed, corpus):
+	mask = corpus.lengths == len(fixed)
+	if len(fixed) > corpus.width : return mask
+	for col, syms in enumerate(fixed.positions) :
+		if syms is None : continue
+		ids = [ corpus.syms[s] for s in syms if s in corpus.syms ]
+		mask &= np.isin(corpus.matrix[:, col], ids)
+	return mask
+
+#boolean mask of the corpus rows matching the pattern
+#  if the DFA blew up every sequence is checked with fallback(seq) instead
+def match_many(pattern, corpus, fallback, fast=True):
+	if fast and pattern.fixed is not None : return match_fixed(pattern.fixed, corpus)
+	res = dfa_table(pattern, corpus.syms)
+	if res is None : return np.fromiter((fallback(s) for s in corpus.seqs), dtype=bool, count=len(corpus))
+	table, accept, sym2cls, start, dead = res
+	cur = np.full(len(corpus), start, dtype=np.int32)
+	for col in range(corpus.width) :
+		cur = table[cur, sym2cls[corpus.matrix[:, col]]]
+		if dead >= 0 and col % 8 == 7 and (cur == dead).all() : break
+	return accept[cur]